@@ -0,0 +1,165 @@
+import os
+import json
+import struct
+import cv2
+import numpy as np
+
+# Compiled animations: one file per (animation, scale)
+COMPILED_FOLDER = os.path.join("data", "compiled_reactions")
+ASSET_MAGIC = b"RXANIM01"
+DATA_ALIGNMENT = 64
+
+os.makedirs(COMPILED_FOLDER, exist_ok=True)
+
+class Sprite:
+    """
+    One animation frame, pre-scaled and stored with premultiplied alpha:
+    color is BGR * alpha / 255 and inv_alpha is 255 - alpha (both uint8, 3 channels),
+    so blending is roi * inv_alpha / 255 + color.
+    Frames without an alpha channel have inv_alpha set to None.
+    """
+
+    __slots__ = ("color", "inv_alpha")
+
+    def __init__(self, color, inv_alpha):
+        self.color = color
+        self.inv_alpha = inv_alpha
+
+    @property
+    def nbytes(self):
+        return self.color.nbytes + (self.inv_alpha.nbytes if self.inv_alpha is not None else 0)
+
+def make_sprite(frame, scale):
+    """
+    Scale a decoded frame and premultiply its alpha once.
+    """
+    rgb_frame = cv2.resize(frame[:, :, :3], (0, 0), fx=scale, fy=scale)
+    if frame.shape[2] != 4:
+        return Sprite(rgb_frame, None)
+
+    h, w, _ = rgb_frame.shape
+    alpha = cv2.resize(frame[:, :, 3], (w, h))
+    alpha3 = cv2.merge((alpha, alpha, alpha))
+    color = cv2.multiply(rgb_frame, alpha3, scale=1 / 255.0)
+    return Sprite(color, cv2.bitwise_not(alpha3))
+
+def asset_path(name, scale):
+    return os.path.join(COMPILED_FOLDER, f"{name}@{scale:g}.anim")
+
+def source_signature(frame_paths):
+    """
+    Name, size and mtime of every source frame; the asset is stale when this changes.
+    """
+    signature = []
+    for path in frame_paths:
+        stat = os.stat(path)
+        signature.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return signature
+
+def _read_header(f):
+    if f.read(len(ASSET_MAGIC)) != ASSET_MAGIC:
+        return None, 0
+    (header_len,) = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(header_len).decode("utf-8"))
+    data_offset = _align(len(ASSET_MAGIC) + 4 + header_len)
+    return header, data_offset
+
+def _align(offset):
+    return (offset + DATA_ALIGNMENT - 1) // DATA_ALIGNMENT * DATA_ALIGNMENT
+
+def write_compiled_animation(name, frame_paths, scale, sprites):
+    """
+    Write sprites to a single binary file: magic, JSON header, then the color
+    block (n, h, w, 3) followed by the inverse-alpha block, both uint8.
+    Returns False if the sprites cannot be packed (e.g. mixed frame sizes).
+    """
+    if not sprites:
+        return False
+    shape = sprites[0].color.shape
+    if any(s.color.shape != shape for s in sprites):
+        print(f"⚠️ Frames of '{name}' differ in size; not compiling.")
+        return False
+
+    has_alpha = any(s.inv_alpha is not None for s in sprites)
+    header = json.dumps({
+        "name": name,
+        "scale": scale,
+        "frames": len(sprites),
+        "height": shape[0],
+        "width": shape[1],
+        "has_alpha": has_alpha,
+        "sources": source_signature(frame_paths),
+    }).encode("utf-8")
+
+    path = asset_path(name, scale)
+    tmp_path = f"{path}.{os.getpid()}.tmp"  # The build step may run while the app compiles too
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(ASSET_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            for s in sprites:
+                f.write(np.ascontiguousarray(s.color).tobytes())
+            if has_alpha:
+                opaque = np.zeros(shape, dtype=np.uint8)
+                for s in sprites:
+                    f.write(np.ascontiguousarray(s.inv_alpha if s.inv_alpha is not None else opaque).tobytes())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not write compiled animation {path}: {e}")
+        return False
+
+    return True
+
+def load_compiled_animation(name, frame_paths, scale):
+    """
+    Memory-map a compiled animation and return its Sprites, or None if the file
+    is missing or its source frames changed since it was built.
+    """
+    path = asset_path(name, scale)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            header, data_offset = _read_header(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read compiled animation {path}: {e}")
+        return None
+
+    if header is None or header["sources"] != source_signature(frame_paths):
+        return None
+
+    shape = (header["frames"], header["height"], header["width"], 3)
+    if header["frames"] == 0:
+        return []
+    try:
+        colors = np.memmap(path, dtype=np.uint8, mode="r", offset=data_offset, shape=shape)
+        if not header["has_alpha"]:
+            return [Sprite(color, None) for color in colors]
+        inv_alphas = np.memmap(path, dtype=np.uint8, mode="r", offset=data_offset + colors.nbytes, shape=shape)
+    except (OSError, ValueError) as e:
+        # e.g. a truncated file: treat it as stale so it gets compiled again
+        print(f"⚠️ Could not map compiled animation {path}: {e}")
+        return None
+    return [Sprite(color, inv_alpha) for color, inv_alpha in zip(colors, inv_alphas)]
+
+# Build step: compile every animation under reactions/ (only the ones whose frames changed)
+if __name__ == "__main__":
+    import sys
+    from app.gesture_responder import (
+        REACTIONS_FOLDER, DEFAULT_ANIMATION_SCALE, gesture_frame_paths, load_gesture_animation
+    )
+
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ANIMATION_SCALE
+    for name in sorted(os.listdir(REACTIONS_FOLDER)):
+        frame_paths = gesture_frame_paths(name)
+        if not frame_paths:
+            continue
+        if load_compiled_animation(name, frame_paths, scale) is not None:
+            print(f"✔️ {name}: up to date")
+            continue
+        sprites = [make_sprite(f, scale) for f in load_gesture_animation(name)]
+        if write_compiled_animation(name, frame_paths, scale, sprites):
+            print(f"✅ {name}: compiled {len(sprites)} frame(s) -> {asset_path(name, scale)}")
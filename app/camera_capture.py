@@ -0,0 +1,196 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+from app.stage_timer import timings
+
+class CapturedFrame:
+    """
+    A frame handed out by CameraCapture, with its sequence number and capture time.
+    The frame stays valid until the consumer reads the next one.
+    """
+
+    __slots__ = ("frame", "seq", "timestamp")
+
+    def __init__(self, frame, seq, timestamp):
+        self.frame = frame
+        self.seq = seq
+        self.timestamp = timestamp
+
+class CameraCapture:
+    """
+    Reads frames on its own thread into a small ring of preallocated buffers,
+    mirrors them there, and hands the consumer the newest one.
+
+    With a live camera, frames the consumer was too slow to take are dropped
+    (and counted), so stale images never queue up. Video files are read without
+    dropping by default, so a replay sees every frame; pass realtime=True to pace
+    a file at its own frame rate and drop like a camera instead.
+    """
+
+    def __init__(self, source=0, ring_size=3, mirror=True, realtime=None):
+        self.source = source
+        self.mirror = mirror
+        # Stream URLs (rtsp://, http://) arrive live like a camera; only paths are files
+        self.is_file = isinstance(source, str) and "://" not in source
+        self.realtime = (not self.is_file) if realtime is None else realtime
+
+        self._cap = cv2.VideoCapture(source)
+        self._slots = [None] * max(ring_size, 3)  # newest + held by consumer + being written
+        self._cond = threading.Condition()
+        self._latest = None       # slot index of the newest frame
+        self._latest_read = True
+        self._held = None         # slot index the consumer is using
+        self._seq = 0
+        self._timestamps = [0.0] * len(self._slots)
+        self._seqs = [0] * len(self._slots)
+        self._ended = False
+        self._running = False
+        self._thread = None
+
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._wait_latency_sum = 0.0
+        self._e2e_latency_sum = 0.0
+        self._e2e_latency_max = 0.0
+        self._e2e_count = 0
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def frame_rate(self):
+        """
+        Nominal frame rate of the source (0.0 if unknown).
+        """
+        fps = self._cap.get(cv2.CAP_PROP_FPS)
+        return fps if fps and fps > 0 else 0.0
+
+    def start(self):
+        if not self._running and self.isOpened():
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="CameraCapture", daemon=True)
+            self._thread.start()
+        return self
+
+    def release(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        self._cap.release()
+
+    def read_frame(self, timeout=None):
+        """
+        Block until a frame newer than the last one read is available and return it
+        as a CapturedFrame, or None once the source has ended.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: not self._latest_read or self._ended or not self._running, timeout):
+                return None
+            if self._latest_read:
+                return None
+
+            self._held = self._latest
+            self._latest_read = True
+            self.delivered += 1
+            captured = CapturedFrame(self._slots[self._held], self._seqs[self._held], self._timestamps[self._held])
+            self._wait_latency_sum += time.time() - captured.timestamp
+            self._cond.notify_all()
+            return captured
+
+    def read(self):
+        """
+        cv2.VideoCapture-style read: returns (ok, frame).
+        """
+        captured = self.read_frame()
+        if captured is None:
+            return False, None
+        return True, captured.frame
+
+    def snapshot(self):
+        """
+        Return a private copy of the newest frame (safe to keep and use on any thread).
+        """
+        with self._cond:
+            if self._latest is None:
+                return None
+            return self._slots[self._latest].copy()
+
+    def frame_done(self, captured):
+        """
+        Record end-to-end latency once the consumer has finished with a frame
+        (e.g. right after displaying it).
+        """
+        latency = time.time() - captured.timestamp
+        self._e2e_latency_sum += latency
+        self._e2e_latency_max = max(self._e2e_latency_max, latency)
+        self._e2e_count += 1
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "capture_to_read_ms": 1000 * self._wait_latency_sum / self.delivered if self.delivered else None,
+            "end_to_end_ms": 1000 * self._e2e_latency_sum / self._e2e_count if self._e2e_count else None,
+            "end_to_end_max_ms": 1000 * self._e2e_latency_max,
+        }
+
+    def _run(self):
+        raw = None
+        frame_interval = 0.0
+        if self.is_file and self.realtime:
+            fps = self.frame_rate()
+            frame_interval = 1.0 / fps if fps else 0.0
+        next_frame_time = time.time()
+
+        while self._running:
+            ok, raw = self._cap.read(raw)
+            if not ok:
+                break
+            timestamp = time.time()
+
+            if frame_interval:
+                next_frame_time += frame_interval
+                delay = next_frame_time - timestamp
+                if delay > 0:
+                    time.sleep(delay)
+                    timestamp = time.time()
+
+            with self._cond:
+                if not self.realtime:
+                    # Lossless mode: wait until the consumer took the previous frame
+                    self._cond.wait_for(lambda: self._latest_read or not self._running)
+                    if not self._running:
+                        break
+                slot = next(i for i in range(len(self._slots)) if i != self._latest and i != self._held)
+
+            # The slot is neither the newest nor the consumer's, so it can be written unlocked
+            buffer = self._slots[slot]
+            if buffer is None or buffer.shape != raw.shape:
+                buffer = np.empty_like(raw)
+                self._slots[slot] = buffer
+            with timings.stage("capture.flip"):
+                if self.mirror:
+                    cv2.flip(raw, 1, dst=buffer)
+                else:
+                    np.copyto(buffer, raw)
+
+            with self._cond:
+                if not self._latest_read:
+                    self.dropped += 1
+                self._seq += 1
+                self._seqs[slot] = self._seq
+                self._timestamps[slot] = timestamp
+                self._latest = slot
+                self._latest_read = False
+                self.captured += 1
+                self._cond.notify_all()
+
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
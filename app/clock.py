@@ -0,0 +1,61 @@
+import time
+
+class SystemClock:
+    """
+    Wall-clock time (the default).
+    """
+
+    def now(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+class SimulatedClock:
+    """
+    Clock that only moves when told to, e.g. by the timestamps of a replayed video.
+    Lets the app's timing logic (wave duration, gesture delays, animations) run
+    faster than real time and give the same decisions on every run.
+    """
+
+    def __init__(self, start=0.0):
+        self._now = start
+
+    def now(self):
+        return self._now
+
+    def set(self, timestamp):
+        self._now = max(self._now, timestamp)
+
+    def advance(self, seconds):
+        self._now += seconds
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+_clock = SystemClock()
+
+def now():
+    """
+    Current time in seconds, from the active clock. Use this instead of time.time()
+    for anything that drives app behaviour (not for measuring real latency).
+    """
+    return _clock.now()
+
+def sleep(seconds):
+    """
+    Wait on the active clock (a simulated clock just moves forward).
+    """
+    _clock.sleep(seconds)
+
+def use_clock(clock):
+    """
+    Make clock the active clock. Returns the previous one.
+    """
+    global _clock
+    previous = _clock
+    _clock = clock
+    return previous
+
+def get_clock():
+    return _clock
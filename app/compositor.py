@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+
+from app.config import RAW_BACKGROUND
+
+DISPLAY_WIDTH_RATIO = 0.8  # Display is 80% as wide as the camera frame
+
+def display_size(frame):
+    """
+    (width, height) of the composed display for a given camera frame.
+    """
+    return int(frame.shape[1] * DISPLAY_WIDTH_RATIO), frame.shape[0]
+
+class FrameCompositor:
+    """
+    Layered frame composition with a static background layer.
+
+    The background is resized once per output size and cached; begin() copies it
+    into a reused output buffer, and the dynamic layers (avatar sprite, status
+    text, user preview, subtitles) are then drawn on top of that buffer.
+    The buffer stays valid until the next begin() call.
+    """
+
+    def __init__(self, background=RAW_BACKGROUND):
+        self._raw_background = background
+        self._backgrounds = {}  # (width, height) -> resized background
+        self._buffer = None
+
+    def background(self, size):
+        layer = self._backgrounds.get(size)
+        if layer is None:
+            layer = cv2.resize(self._raw_background, size)
+            self._backgrounds[size] = layer
+        return layer
+
+    def begin(self, size):
+        """
+        Return the output buffer for a new frame, reset to the background.
+        """
+        layer = self.background(size)
+        if self._buffer is None or self._buffer.shape != layer.shape:
+            self._buffer = np.empty_like(layer)
+        np.copyto(self._buffer, layer)
+        return self._buffer
+
+# Shared compositor for the UI thread
+compositor = FrameCompositor()
+
+# Benchmark: per-frame background cost and allocations, before vs. after
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    size = (512, 480)  # 80% of a 640x480 camera frame
+    repeats = 500
+
+    def measure(step):
+        step()  # warm-up (fills caches)
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            step()
+        elapsed = (time.perf_counter() - start) / repeats
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed * 1000, peak / 2**10
+
+    old_ms, old_peak = measure(lambda: cv2.resize(RAW_BACKGROUND, size).copy())
+    new_ms, new_peak = measure(lambda: compositor.begin(size))
+
+    print(f"resize + copy per frame:   {old_ms:6.3f} ms, peak traced {old_peak:8.1f} KiB")
+    print(f"cached layer + reuse:      {new_ms:6.3f} ms, peak traced {new_peak:8.1f} KiB")
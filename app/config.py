@@ -49,6 +49,50 @@ SHOW_WAVE_MESSAGE_DURATION = 4.5
 
 RECOGNITION_TIMEOUT = 5  # Seconds to wait before prompting wave
 
+# ==========================
+# Face Model Settings
+# ==========================
+
+FACE_MODEL_NAME = "buffalo_l"
+FACE_MODEL_MODULES = ["detection", "recognition"]  # None loads every module in the pack
+FACE_DET_SIZE = (640, 640)                          # Detector input size (width, height)
+
+# ==========================
+# Speech Settings
+# ==========================
+
+TTS_ENGINE = "pyttsx3"     # "pyttsx3" for real speech, "silent" to run without audio
+TTS_VOICE_HINT = "david"   # First installed voice whose id contains this is used
+TTS_RATE = 150             # Words per minute
+TTS_VOLUME = 1.0
+TTS_CACHE_FOLDER = "data/tts_cache"  # Rendered WAV files of repeated phrases
+
+# ==========================
+# Spoken Prompts
+# ==========================
+
+GESTURE_PROMPT = "Let me know how I can help, just show me a hand gesture."
+GOODBYE_MESSAGE = "Take care and have a lovely day. I will see you again soon!."
+REGISTRATION_INTRO = [
+    "Hi there! I am Luis. I do not recognize you yet. Your face is new to me.",
+    "Could you please type your name and role on the keyboard so we can get to know each other?"
+]
+PHOTO_PROMPT = "Could you stay still for a moment? I will take a picture of you."
+REMINDER_PROMPT = "At what time should I remind you to take your medication? Please type it as for example 3 PM or 08:30 AM."
+
+# Fixed prompts rendered ahead of time by "python -m app.text_to_speech --prerender"
+FIXED_PROMPTS = [GESTURE_PROMPT, GOODBYE_MESSAGE, *REGISTRATION_INTRO, PHOTO_PROMPT, REMINDER_PROMPT]
+
+# ==========================
+# Instrumentation
+# ==========================
+
+STAGE_TIMING = False          # Per-stage latency histograms (also: main.py --timings)
+STAGE_TIMING_INTERVAL = 10.0  # Seconds between printed summaries
+
+METRICS_PORT = 9108             # Prometheus endpoint (main.py --metrics)
+METRICS_ADDRESS = "127.0.0.1"   # Localhost only
+
 # ==========================
 # Global Background Image
 # ==========================
@@ -1,17 +1,24 @@
-from app.role_identifier import get_user_role
-from app.role_database import USER_ROLES
-from app.text_to_speech import speak_text
-from app.visit_logger import log_user_visit, user_visited_today, get_last_visit
+from app.role_directory import directory, CARER_ROLES, ELDERLY_ROLE
+from app.text_to_speech import speak_async
+from app.visit_logger import log_user_visit, user_visited_today
+from app.config import GESTURE_PROMPT
 
-import threading
-from datetime import datetime
+MAX_MENTIONED_ELDERLY = 3  # Keep the spoken greeting short
 
-def speak_in_background(message: str):
-    thread = threading.Thread(target=speak_text, args=(message,))
-    thread.start()
+def _describe_time(moment):
+    hour = moment.hour
+    if 5 <= hour < 12:
+        period = "morning"
+    elif 12 <= hour < 18:
+        period = "afternoon"
+    else:
+        period = "evening"
+
+    time_str = moment.strftime("%I:%M %p").lstrip("0")
+    return f"in the {period} at {time_str.lower()}"
 
 def greet_user_by_role(name: str):
-    role = get_user_role(name)
+    role = directory.role_of(name)
     name_clean = name.capitalize()
 
     first_visit = not user_visited_today(name)
@@ -19,33 +26,20 @@ def greet_user_by_role(name: str):
 
     greeting = f"Hello {name_clean}, you are recognized as a {role}."
 
-    # 👨‍👩‍👧 Mention elderly user's last visit if this is a family member or caregiver
-    if role in ["Family member", "Caregiver"]:
-        elderly_users = [user for user, r in USER_ROLES.items() if r == "Elderly user"]
-        if elderly_users:
-            elderly_name = elderly_users[0].capitalize()
-            last_seen_time = get_last_visit(elderly_users[0])
+    # 👨‍👩‍👧 Mention when the elderly users they look after were last seen
+    if role in CARER_ROLES:
+        for elderly, last_seen_time in directory.linked_elderly(name)[:MAX_MENTIONED_ELDERLY]:
             if last_seen_time:
-                hour = last_seen_time.hour
-                if 5 <= hour < 12:
-                    period = "morning"
-                elif 12 <= hour < 18:
-                    period = "afternoon"
-                else:
-                    period = "evening"
-
-                time_str = last_seen_time.strftime("%I:%M %p").lstrip("0")
-                greeting += f" Last time I saw {elderly_name} was in the {period} at {time_str.lower()}."
+                greeting += f" Last time I saw {elderly.capitalize()} was {_describe_time(last_seen_time)}."
 
     # 🧓 Elderly-specific phrasing
-    if role == "Elderly user":
+    if role == ELDERLY_ROLE:
         if first_visit:
             greeting += " It's nice to see you today. I hope you're feeling well."
         else:
             greeting = f"Welcome back {name_clean}, it's good to see you again."
 
     # 🖐️ Add natural transition to gesture mode
-    gesture_prompt = "Let me know how I can help, just show me a hand gesture."
-    full_message = f"{greeting} {gesture_prompt}"
-
-    speak_in_background(full_message)
+    # (spoken separately so the fixed prompt can be played from the phrase cache)
+    speak_async(greeting)
+    speak_async(GESTURE_PROMPT)
@@ -0,0 +1,183 @@
+import os
+import queue
+import sqlite3
+import threading
+import atexit
+from concurrent.futures import Future
+
+# Single local database for people, roles, visits and face embeddings
+DB_FOLDER = "data"
+# FACE_GESTURE_DB selects another file, e.g. the scratch copy used by replay.py
+DB_FILE = os.environ.get("FACE_GESTURE_DB") or os.path.join(DB_FOLDER, "face_gesture.db")
+
+os.makedirs(DB_FOLDER, exist_ok=True)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS people (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS roles (
+    person_id INTEGER PRIMARY KEY REFERENCES people(id),
+    role TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_roles_role ON roles(role);
+CREATE TABLE IF NOT EXISTS care_links (
+    person_id INTEGER NOT NULL REFERENCES people(id),
+    elderly_id INTEGER NOT NULL REFERENCES people(id),
+    PRIMARY KEY (person_id, elderly_id)
+);
+CREATE TABLE IF NOT EXISTS visits (
+    id INTEGER PRIMARY KEY,
+    person_id INTEGER NOT NULL REFERENCES people(id),
+    day TEXT NOT NULL,
+    visited_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_visits_person_day ON visits(person_id, day, visited_at);
+CREATE TABLE IF NOT EXISTS embeddings (
+    image_path TEXT PRIMARY KEY,
+    person_id INTEGER REFERENCES people(id),
+    model TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    vector BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_embeddings_model ON embeddings(model);
+"""
+
+_STOP = object()
+
+class Database:
+    """
+    SQLite database in WAL mode.
+
+    Reads go through a shared connection (guarded by a lock). Writes are queued
+    to a single writer thread that commits them in batches, so callers on the
+    render loop never wait for the disk. write() returns a Future for callers
+    that do need to know when the data is stored; flush() waits for everything queued.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._read_conn = self._connect()
+        self._read_conn.executescript(SCHEMA)
+        self._read_lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="DatabaseWriter", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def query(self, sql, params=()):
+        with self._read_lock:
+            return self._read_conn.execute(sql, params).fetchall()
+
+    def write(self, operation):
+        """
+        Queue operation(conn) to run on the writer thread. Returns a Future with its result.
+        """
+        future = Future()
+        self._queue.put((operation, future))
+        return future
+
+    def execute(self, sql, params=()):
+        """
+        Queue a single statement.
+        """
+        return self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    def flush(self, timeout=None):
+        """
+        Block until every write queued so far is committed.
+        """
+        self.write(lambda conn: None).result(timeout=timeout)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5.0)
+        with self._read_lock:
+            self._read_conn.close()
+
+    def get_meta(self, key):
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key, value):
+        return self.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _commit_batch(self, conn, operations):
+        """
+        Run operations in one transaction. Returns (future, result, error) per operation.
+        """
+        results = []
+        conn.execute("BEGIN")
+        for operation, future in operations:
+            # Each operation gets a savepoint, so a failing one does not undo the rest
+            conn.execute("SAVEPOINT op")
+            try:
+                results.append((future, operation(conn), None))
+                conn.execute("RELEASE op")
+            except Exception as e:
+                conn.execute("ROLLBACK TO op")
+                conn.execute("RELEASE op")
+                results.append((future, None, e))
+        conn.execute("COMMIT")
+        return results
+
+    def _write_loop(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            operations = [item for item in batch if item is not _STOP]
+            stopping = len(operations) < len(batch)
+            try:
+                results = self._commit_batch(conn, operations)
+            except sqlite3.Error as e:
+                # e.g. the database is locked or the disk is full: fail this batch, keep the writer alive
+                print(f"[ERROR] Database batch of {len(operations)} write(s) failed: {e}")
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass  # No transaction left to roll back
+                results = [(future, None, e) for _, future in operations]
+
+            for future, result, error in results:
+                if future.cancelled():
+                    continue
+                if error is not None:
+                    print(f"[ERROR] Database write failed: {error}")
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+        conn.close()
+
+def person_id(conn, name):
+    """
+    Id of a person, creating the row if needed. For use inside write operations.
+    """
+    conn.execute("INSERT OR IGNORE INTO people (name) VALUES (?)", (name,))
+    return conn.execute("SELECT id FROM people WHERE name = ?", (name,)).fetchone()[0]
+
+# Shared database used by roles, visits and the embedding cache
+db = Database()
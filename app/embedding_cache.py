@@ -0,0 +1,168 @@
+import os
+import hashlib
+import numpy as np
+
+from app.database import db, person_id
+
+# Path to the legacy .npz embedding cache (imported into the database once)
+CACHE_FOLDER = "data"
+CACHE_FILE = os.path.join(CACHE_FOLDER, "face_embeddings_cache.npz")
+
+os.makedirs(CACHE_FOLDER, exist_ok=True)
+
+class CacheEntry:
+    """
+    Cached embedding of one image, keyed by the image's size, mtime and content hash.
+    The embedding is None when no face was found in the image.
+    """
+
+    __slots__ = ("size", "mtime_ns", "digest", "embedding")
+
+    def __init__(self, size, mtime_ns, digest, embedding):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.digest = digest
+        self.embedding = embedding
+
+    def matches_stat(self, stat):
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Return the SHA-1 hex digest of a file's content.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _load_npz_cache(cache_file=CACHE_FILE):
+    """
+    Read the legacy .npz cache as (model name, dict of image path -> CacheEntry).
+    """
+    try:
+        with np.load(cache_file, allow_pickle=False) as data:
+            model_name = str(data["model_name"])
+            paths = data["paths"]
+            sizes = data["sizes"]
+            mtimes = data["mtimes_ns"]
+            digests = data["digests"]
+            has_face = data["has_face"]
+            embeddings = data["embeddings"]
+    except Exception as e:
+        print(f"⚠️ Could not read embedding cache: {e}")
+        return None, {}
+
+    return model_name, {
+        str(path): CacheEntry(
+            int(size), int(mtime), str(digest),
+            embedding if found else None
+        )
+        for path, size, mtime, digest, found, embedding
+        in zip(paths, sizes, mtimes, digests, has_face, embeddings)
+    }
+
+def _migrate_npz_cache():
+    """
+    Import the legacy .npz cache into the database the first time it runs.
+    """
+    if db.get_meta("embeddings_migrated"):
+        return
+    if os.path.exists(CACHE_FILE):
+        model_name, entries = _load_npz_cache()
+        if entries:
+            print(f"📦 Importing {len(entries)} cached embedding(s) from {CACHE_FILE}")
+            save_embedding_cache(entries, model_name)
+    db.set_meta("embeddings_migrated", 1)
+    db.flush()
+
+def _person_name(path):
+    # Same form as roles and visits use ("Oli.jpg" -> "oli")
+    return os.path.splitext(os.path.basename(path))[0].strip().lower()
+
+def _normalize_people():
+    """
+    Point embeddings stored under the raw file name ("Oli") at the lowercase
+    person that roles and visits use, once, and drop the then unused rows.
+    """
+    if db.get_meta("embedding_people_normalized"):
+        return
+
+    def write(conn):
+        rows = conn.execute("SELECT image_path FROM embeddings").fetchall()
+        for (path,) in rows:
+            conn.execute(
+                "UPDATE embeddings SET person_id = ? WHERE image_path = ?",
+                (person_id(conn, _person_name(path)), path)
+            )
+        conn.execute(
+            "DELETE FROM people WHERE name != lower(trim(name)) "
+            "AND id NOT IN (SELECT person_id FROM embeddings WHERE person_id IS NOT NULL) "
+            "AND id NOT IN (SELECT person_id FROM roles) "
+            "AND id NOT IN (SELECT person_id FROM visits) "
+            "AND id NOT IN (SELECT person_id FROM care_links) "
+            "AND id NOT IN (SELECT elderly_id FROM care_links)"
+        )
+    db.write(write)
+    db.set_meta("embedding_people_normalized", 1)
+    db.flush()
+
+def _upsert(conn, path, entry, model_name):
+    name = _person_name(path)
+    vector = None
+    if entry.embedding is not None:
+        vector = np.asarray(entry.embedding, dtype=np.float32).tobytes()
+    conn.execute(
+        "INSERT OR REPLACE INTO embeddings (image_path, person_id, model, size, mtime_ns, digest, vector) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (path, person_id(conn, name), model_name, entry.size, entry.mtime_ns, entry.digest, vector)
+    )
+
+def load_embedding_cache(model_name):
+    """
+    Load cached embeddings as a dict of image path -> CacheEntry.
+    Entries computed with another model are ignored (and dropped on the next save).
+    """
+    _migrate_npz_cache()
+    _normalize_people()
+    rows = db.query(
+        "SELECT image_path, size, mtime_ns, digest, vector FROM embeddings WHERE model = ?",
+        (model_name,)
+    )
+    return {
+        path: CacheEntry(
+            size, mtime_ns, digest,
+            np.frombuffer(vector, dtype=np.float32) if vector is not None else None
+        )
+        for path, size, mtime_ns, digest, vector in rows
+    }
+
+def save_embedding_cache(entries, model_name, previous=None):
+    """
+    Make the cache match a dict of image path -> CacheEntry, in one transaction
+    on the database writer thread. Returns a Future.
+
+    previous is the dict load_embedding_cache returned; only entries that are not
+    the same object as there are written. Rows of images not in entries, and rows
+    of other models, are deleted.
+    """
+    paths = set(entries)
+    changed = {
+        path: entry for path, entry in entries.items()
+        if previous is None or previous.get(path) is not entry
+    }
+
+    def write(conn):
+        conn.execute("DELETE FROM embeddings WHERE model != ?", (model_name,))
+        stored = {path for (path,) in conn.execute("SELECT image_path FROM embeddings")}
+        conn.executemany("DELETE FROM embeddings WHERE image_path = ?", ((p,) for p in stored - paths))
+        for path, entry in changed.items():
+            _upsert(conn, path, entry, model_name)
+    return db.write(write)
+
+def update_embedding_cache(path, entry, model_name):
+    """
+    Insert or replace the cache entry of a single image. Returns a Future.
+    """
+    return db.write(lambda conn: _upsert(conn, path, entry, model_name))
@@ -0,0 +1,148 @@
+import threading
+import time
+import numpy as np
+
+EMBEDDING_SIZE = 512  # ArcFace (buffalo_l) embedding length
+
+class FaceGallery:
+    """
+    Known faces kept as one contiguous float32 matrix of L2-normalized embeddings,
+    with the names in a parallel array. Matching a batch of faces is a single
+    matrix multiply followed by an argmax per face.
+    """
+
+    def __init__(self, dim=EMBEDDING_SIZE, capacity=64):
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._names = np.empty(capacity, dtype=object)
+        self._rows = {}  # name -> row index
+        self._size = 0
+        self._lock = threading.Lock()
+        self.version = 0  # bumped on every change, so caches of match results can tell they are stale
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    @property
+    def names(self):
+        return list(self._names[:self._size])
+
+    def add(self, name, embedding):
+        """
+        Add a new identity or replace the embedding of an existing one.
+        """
+        vector = _normalize(np.asarray(embedding, dtype=np.float32).reshape(self.dim))
+        with self._lock:
+            row = self._rows.get(name)
+            if row is None:
+                if self._size == len(self._matrix):
+                    self._grow()
+                row = self._size
+                self._size += 1
+                self._rows[name] = row
+                self._names[row] = name
+            self._matrix[row] = vector
+            self.version += 1
+
+    def remove(self, name):
+        """
+        Remove an identity by moving the last row into its slot (O(1)).
+        Returns False if the name was not in the gallery.
+        """
+        with self._lock:
+            row = self._rows.pop(name, None)
+            if row is None:
+                return False
+            last = self._size - 1
+            if row != last:
+                moved = self._names[last]
+                self._matrix[row] = self._matrix[last]
+                self._names[row] = moved
+                self._rows[moved] = row
+            self._names[last] = None
+            self._size = last
+            self.version += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._names[:] = None
+            self._size = 0
+            self.version += 1
+
+    def match(self, embeddings, threshold=0.5):
+        """
+        Match a batch of embeddings (N x dim) against the gallery.
+
+        Returns a list of (name, similarity) tuples, one per embedding.
+        The name is None when the best similarity is not above the threshold.
+        """
+        queries = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+        if len(queries) == 0:
+            return []
+
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            if self._size == 0:
+                return [(None, -1.0)] * len(queries)
+            scores = queries @ self._matrix[:self._size].T
+            best_rows = np.argmax(scores, axis=1)
+            best_scores = scores[np.arange(len(queries)), best_rows]
+            best_names = self._names[best_rows]
+
+        return [
+            (name if score > threshold else None, float(score))
+            for name, score in zip(best_names, best_scores)
+        ]
+
+    def _grow(self):
+        capacity = len(self._matrix) * 2
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        names = np.empty(capacity, dtype=object)
+        names[:self._size] = self._names[:self._size]
+        self._matrix = matrix
+        self._names = names
+
+def _normalize(vector):
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return vector
+    return vector / norm
+
+# Benchmark: matching latency as the gallery grows
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    faces_per_frame = 3
+    repeats = 200
+
+    print(f"{'identities':>10} | {'gallery.match':>14} | {'python loop':>12}")
+    for size in [10, 100, 1_000, 10_000, 100_000]:
+        embeddings = rng.standard_normal((size, EMBEDDING_SIZE)).astype(np.float32)
+        queries = rng.standard_normal((faces_per_frame, EMBEDDING_SIZE)).astype(np.float32)
+
+        gallery = FaceGallery()
+        for i, embedding in enumerate(embeddings):
+            gallery.add(f"person_{i}", embedding)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            gallery.match(queries)
+        vectorized_ms = (time.perf_counter() - start) / repeats * 1000
+
+        # Old approach: per-entry cosine similarity in Python (sampled on small galleries)
+        loop_repeats = max(1, repeats * 10 // size) if size <= 10_000 else 1
+        known = {f"person_{i}": e for i, e in enumerate(embeddings)}
+        start = time.perf_counter()
+        for _ in range(loop_repeats):
+            for query in queries:
+                for name, known_embedding in known.items():
+                    np.dot(query, known_embedding) / (np.linalg.norm(query) * np.linalg.norm(known_embedding))
+        loop_ms = (time.perf_counter() - start) / loop_repeats * 1000
+
+        print(f"{size:>10} | {vectorized_ms:>11.3f} ms | {loop_ms:>9.3f} ms")
@@ -0,0 +1,61 @@
+import os
+import time
+from insightface.app import FaceAnalysis
+
+from app.config import FACE_MODEL_NAME, FACE_MODEL_MODULES, FACE_DET_SIZE
+
+def create_face_model(modules=FACE_MODEL_MODULES, det_size=FACE_DET_SIZE, name=FACE_MODEL_NAME):
+    """
+    Create and prepare the InsightFace model pack.
+
+    Only the modules in the allow-list are loaded (by default detection and
+    recognition), so app.get() does not run landmark or gender/age models
+    whose outputs the project never uses. Pass modules=None to load everything.
+    """
+    model = FaceAnalysis(name=name, allowed_modules=modules, providers=['CPUExecutionProvider'])
+    model.prepare(ctx_id=0, det_size=det_size)
+    return model
+
+def _benchmark_config(modules, det_size, image_path, repeats):
+    """
+    Load one module configuration and measure resident memory and per-call latency.
+    Meant to run in a fresh process so memory numbers do not overlap.
+    """
+    import cv2
+    import psutil
+
+    process = psutil.Process(os.getpid())
+    image = cv2.imread(image_path)
+    rss_before = process.memory_info().rss
+
+    model = create_face_model(modules=modules, det_size=det_size)
+    model.get(image)  # warm-up
+    rss_loaded = process.memory_info().rss
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.get(image)
+    latency = (time.perf_counter() - start) / repeats
+
+    return sorted(model.models.keys()), (rss_loaded - rss_before) / 2**20, latency * 1000
+
+# Benchmark: per-call latency and memory for each module configuration on CPU
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+
+    image_path = os.path.join("known_faces", "jr.jpg")
+    repeats = 20
+    configs = [
+        ["detection", "recognition"],
+        ["detection", "recognition", "landmark_2d_106"],
+        ["detection", "recognition", "genderage"],
+        None,
+    ]
+
+    print(f"Benchmarking {FACE_MODEL_NAME} on {image_path} (det_size={FACE_DET_SIZE}, {repeats} calls)")
+    for modules in configs:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            loaded, memory_mb, latency_ms = pool.submit(
+                _benchmark_config, modules, FACE_DET_SIZE, image_path, repeats
+            ).result()
+        print(f"{', '.join(loaded):<70} | {latency_ms:8.1f} ms/call | {memory_mb:7.1f} MB RSS")
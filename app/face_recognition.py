@@ -1,34 +1,102 @@
 import os
 import cv2
 import numpy as np
-import insightface
-from insightface.app import FaceAnalysis
+from insightface.app.common import Face
 
-# Load the face model
-app = FaceAnalysis(name='buffalo_l', providers=['CPUExecutionProvider'])
-app.prepare(ctx_id=0)
+from app.config import FACE_MODEL_NAME
+from app.face_model import create_face_model
+from app.face_gallery import FaceGallery
+from app.stage_timer import timings
+from app.embedding_cache import (
+    CacheEntry, load_embedding_cache, save_embedding_cache, update_embedding_cache, file_digest
+)
 
-# Store registered faces
-KNOWN_FACE_EMBEDDINGS = {}
+# Load the face model (detection + recognition only, see config.FACE_MODEL_MODULES)
+app = create_face_model()
+
+# Store registered faces (pre-normalized embedding matrix + names)
+KNOWN_FACE_GALLERY = FaceGallery()
+RECOGNITION_THRESHOLD = 0.5
 
 # Register known faces from a folder
 def register_known_faces(folder_path="known_faces"):
+    """
+    Load every face image in the folder into the gallery.
+    Embeddings are reused from the on-disk cache; only new or changed images
+    are decoded and embedded, and cache entries for deleted images are pruned.
+    """
     print(folder_path)
     if not os.path.exists(folder_path):
         print(f"❌ Folder '{folder_path}' not found.")
         return
 
-    for filename in os.listdir(folder_path):
+    cache = load_embedding_cache(FACE_MODEL_NAME)
+    entries = {}
+    registered = set()
+    cache_hits = 0
+
+    for filename in sorted(os.listdir(folder_path)):
         if filename.lower().endswith((".jpg", ".png")):
             name = os.path.splitext(filename)[0]
-            img = cv2.imread(os.path.join(folder_path, filename))
-            if img is None:
-                print(f"⚠️ Could not read {filename}")
-                continue
-            embedding = get_embedding(img)
-            if embedding is not None:
-                KNOWN_FACE_EMBEDDINGS[name] = embedding
-                print(f"✅ Registered: {name}")
+            path = os.path.normpath(os.path.join(folder_path, filename))
+            stat = os.stat(path)
+
+            entry = cache.get(path)
+            if entry is not None and entry.matches_stat(stat):
+                cache_hits += 1
+            else:
+                digest = file_digest(path)
+                if entry is not None and entry.digest == digest:
+                    # Touched but unchanged: keep the embedding, refresh size/mtime
+                    entry = CacheEntry(stat.st_size, stat.st_mtime_ns, digest, entry.embedding)
+                    cache_hits += 1
+                else:
+                    img = cv2.imread(path)
+                    if img is None:
+                        print(f"⚠️ Could not read {filename}")
+                        continue
+                    entry = CacheEntry(stat.st_size, stat.st_mtime_ns, digest, get_embedding(img))
+                    if entry.embedding is not None:
+                        print(f"✅ Registered: {name}")
+
+            entries[path] = entry
+            if entry.embedding is not None:
+                KNOWN_FACE_GALLERY.add(name, entry.embedding)
+                registered.add(name)
+
+    # Forget people whose images were deleted
+    for name in KNOWN_FACE_GALLERY.names:
+        if name not in registered:
+            KNOWN_FACE_GALLERY.remove(name)
+
+    if set(entries) != set(cache) or any(entries[p] is not cache.get(p) for p in entries):
+        save_embedding_cache(entries, FACE_MODEL_NAME, previous=cache)
+
+    print(f"✅ {len(registered)} known face(s) loaded ({cache_hits} from cache).")
+
+# Add a single new face to the live gallery without rescanning the folder
+def enroll_face(name, image, image_path=None):
+    """
+    Embed one image and insert it into the in-memory gallery right away.
+    If the image was saved to disk, its cache entry is updated as well so
+    the next start does not have to embed it again.
+    Returns True if a face was found and enrolled.
+    """
+    embedding = get_embedding(image)
+    if embedding is None:
+        print(f"⚠️ No face found in the picture of {name}.")
+        return False
+
+    KNOWN_FACE_GALLERY.add(name, embedding)
+    print(f"✅ Enrolled: {name}")
+
+    if image_path and os.path.exists(image_path):
+        path = os.path.normpath(image_path)
+        stat = os.stat(path)
+        entry = CacheEntry(stat.st_size, stat.st_mtime_ns, file_digest(path), embedding)
+        update_embedding_cache(path, entry, FACE_MODEL_NAME)
+
+    return True
 
 # Get embedding from image
 def get_embedding(image):
@@ -38,24 +106,23 @@ def get_embedding(image):
     return None
 
 # Detect and recognize faces from a frame
+@timings.timed("detect_and_recognize")
 def detect_and_recognize(frame, scale_factor=0.1):
     recognized_faces = []
 
     small_frame = cv2.resize(frame, (0, 0), fx=scale_factor, fy=scale_factor)
     faces = app.get(small_frame)
+    if not faces:
+        return recognized_faces
 
-    for face in faces:
-        x1, y1, x2, y2 = [int(coord / scale_factor) for coord in face.bbox]
-        embedding = face.embedding
-
-        best_match = None
-        best_similarity = -1
+    # Score every detected face against the whole gallery in one matrix multiply
+    matches = KNOWN_FACE_GALLERY.match(
+        np.stack([face.embedding for face in faces]),
+        threshold=RECOGNITION_THRESHOLD
+    )
 
-        for name, known_embedding in KNOWN_FACE_EMBEDDINGS.items():
-            similarity = cosine_similarity(embedding, known_embedding)
-            if similarity > 0.5 and similarity > best_similarity:
-                best_similarity = similarity
-                best_match = name
+    for face, (best_match, _) in zip(faces, matches):
+        x1, y1, x2, y2 = [int(coord / scale_factor) for coord in face.bbox]
 
         recognized_faces.append({
             "bbox": (x1, y1, x2, y2),
@@ -65,6 +132,27 @@ def detect_and_recognize(frame, scale_factor=0.1):
 
     return recognized_faces
 
+# Run only the face detector on an already-resized frame
+def detect_faces(small_frame):
+    """
+    Return insightface Face objects with bbox, keypoints and det_score, but no embedding.
+    """
+    bboxes, kpss = app.det_model.detect(small_frame, max_num=0, metric='default')
+    return [
+        Face(bbox=bboxes[i, 0:4], kps=kpss[i] if kpss is not None else None, det_score=bboxes[i, 4])
+        for i in range(bboxes.shape[0])
+    ]
+
+# Run the recognition model on faces found by detect_faces
+def embed_faces(small_frame, faces):
+    """
+    Compute the ArcFace embedding of each face (stored on the face) and return them stacked.
+    """
+    recognizer = app.models['recognition']
+    for face in faces:
+        recognizer.get(small_frame, face)
+    return np.stack([face.embedding for face in faces])
+
 # Cosine similarity between two vectors
 def cosine_similarity(vec1, vec2):
     return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
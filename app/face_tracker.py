@@ -0,0 +1,184 @@
+import itertools
+import cv2
+import numpy as np
+
+from app import clock
+from app.frame_pool import FramePool
+from app.stage_timer import timings
+from app.metrics import metrics
+from app.face_recognition import (
+    detect_faces, embed_faces,
+    KNOWN_FACE_GALLERY, RECOGNITION_THRESHOLD
+)
+
+class FaceTrack:
+    """
+    One person followed across frames, with their cached identity.
+    """
+
+    __slots__ = (
+        "track_id", "bbox", "velocity", "name", "similarity",
+        "quality", "last_embedded", "gallery_version", "misses"
+    )
+
+    def __init__(self, track_id, bbox):
+        self.track_id = track_id
+        self.bbox = bbox                    # (x1, y1, x2, y2) in full-frame pixels
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.name = None
+        self.similarity = -1.0
+        self.quality = 0.0                  # quality of the face the identity came from
+        self.last_embedded = 0.0
+        self.gallery_version = -1
+        self.misses = 0
+
+    def predicted_bbox(self):
+        return self.bbox + self.velocity
+
+class FaceTracker:
+    """
+    Associates detections across frames by IoU against each track's motion-predicted
+    box, and keeps the identity of each track cached. The recognition model only runs
+    for a track when it is new, when a clearly better view of the face appears, when
+    the refresh interval has passed, or (for unknown tracks) when the gallery changed.
+
+    update() returns the same face dicts as detect_and_recognize, plus a "track_id".
+    """
+
+    def __init__(self, iou_threshold=0.3, refresh_interval=3.0, max_misses=5,
+                 quality_gain=1.25, velocity_smoothing=0.5):
+        self.iou_threshold = iou_threshold
+        self.refresh_interval = refresh_interval
+        self.max_misses = max_misses
+        self.quality_gain = quality_gain
+        self.velocity_smoothing = velocity_smoothing
+
+        self.tracks = []
+        self._ids = itertools.count(1)
+        self._pool = FramePool()  # runs on the recognition thread, so it has its own pool
+
+        # Counters to see how much work the cache saves
+        self.detections_seen = 0
+        self.embeddings_computed = 0
+
+    @timings.timed("recognize")
+    def update(self, frame, scale_factor=0.3, now=None):
+        now = clock.now() if now is None else now
+
+        h, w = frame.shape[:2]
+        small_size = (round(w * scale_factor), round(h * scale_factor))
+        small_frame = self._pool.get("small_frame", (small_size[1], small_size[0], frame.shape[2]))
+        cv2.resize(frame, small_size, dst=small_frame)
+        detections = detect_faces(small_frame)
+        self.detections_seen += len(detections)
+
+        boxes = np.array([face.bbox for face in detections], dtype=np.float32).reshape(-1, 4) / scale_factor
+        qualities = [_face_quality(face) for face in detections]
+
+        matches, new_detections, lost_tracks = self._associate(boxes)
+
+        # Update matched tracks and decide which ones need a fresh embedding
+        to_embed = []
+        for track, det in matches:
+            new_velocity = boxes[det] - track.bbox
+            track.velocity = (self.velocity_smoothing * track.velocity +
+                              (1 - self.velocity_smoothing) * new_velocity)
+            track.bbox = boxes[det]
+            track.misses = 0
+            if self._needs_recognition(track, qualities[det], now):
+                to_embed.append((track, det))
+
+        for det in new_detections:
+            track = FaceTrack(next(self._ids), boxes[det])
+            self.tracks.append(track)
+            matches.append((track, det))
+            to_embed.append((track, det))
+
+        for track in lost_tracks:
+            track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        # Embed all faces that need it in one batch and match them in one gallery call
+        if to_embed:
+            embeddings = embed_faces(small_frame, [detections[det] for _, det in to_embed])
+            self.embeddings_computed += len(to_embed)
+            results = KNOWN_FACE_GALLERY.match(embeddings, threshold=RECOGNITION_THRESHOLD)
+            for (track, det), (name, similarity) in zip(to_embed, results):
+                metrics.inc("face_matches", "recognized" if name else "unknown")
+                track.name = name
+                track.similarity = similarity
+                track.quality = qualities[det]
+                track.last_embedded = now
+                track.gallery_version = KNOWN_FACE_GALLERY.version
+
+        return [
+            {
+                "bbox": tuple(int(v) for v in track.bbox),
+                "name": track.name or "Unknown",
+                "recognized": bool(track.name),
+                "track_id": track.track_id
+            }
+            for track, _ in matches
+        ]
+
+    def stats(self):
+        return {
+            "tracks": len(self.tracks),
+            "detections_seen": self.detections_seen,
+            "embeddings_computed": self.embeddings_computed,
+        }
+
+    def _needs_recognition(self, track, quality, now):
+        if now - track.last_embedded >= self.refresh_interval:
+            return True
+        if quality > track.quality * self.quality_gain:
+            return True
+        # Someone may just have been enrolled: give unknown faces another look
+        return track.name is None and track.gallery_version != KNOWN_FACE_GALLERY.version
+
+    def _associate(self, boxes):
+        """
+        Greedily pair tracks and detections by descending IoU.
+        Returns (matched (track, detection) pairs, unmatched detections, unmatched tracks).
+        """
+        if not self.tracks or len(boxes) == 0:
+            return [], list(range(len(boxes))), list(self.tracks)
+
+        predicted = np.array([t.predicted_bbox() for t in self.tracks], dtype=np.float32)
+        ious = _iou_matrix(predicted, boxes)
+
+        matches = []
+        used_tracks, used_dets = set(), set()
+        for flat in np.argsort(ious, axis=None)[::-1]:
+            t, d = np.unravel_index(flat, ious.shape)
+            if ious[t, d] < self.iou_threshold:
+                break
+            if t in used_tracks or d in used_dets:
+                continue
+            used_tracks.add(t)
+            used_dets.add(d)
+            matches.append((self.tracks[t], int(d)))
+
+        new_detections = [d for d in range(len(boxes)) if d not in used_dets]
+        lost_tracks = [track for t, track in enumerate(self.tracks) if t not in used_tracks]
+        return matches, new_detections, lost_tracks
+
+def _face_quality(face):
+    """
+    Detector confidence weighted by face size: bigger, sharper faces give better embeddings.
+    """
+    x1, y1, x2, y2 = face.bbox
+    return float(face.det_score) * float(np.sqrt(max(x2 - x1, 0) * max(y2 - y1, 0)))
+
+def _iou_matrix(a, b):
+    """
+    Pairwise IoU between boxes a (N x 4) and b (M x 4).
+    """
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
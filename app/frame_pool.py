@@ -0,0 +1,80 @@
+import numpy as np
+
+class FramePool:
+    """
+    Named, reusable image buffers.
+
+    get() hands back the same array for the same name every frame, and only
+    allocates when the requested shape or dtype changes, so steady-state
+    rendering does not allocate new frame-sized arrays.
+    Not thread-safe: each thread should use its own pool.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+        return buffer
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for b in self._buffers.values())
+
+# Pool for the UI (render) thread
+frame_pool = FramePool()
+
+# Allocation check: a steady-state render loop must not allocate frame-sized arrays
+if __name__ == "__main__":
+    import sys
+    import tracemalloc
+    import cv2
+
+    from app.compositor import FrameCompositor, display_size
+    from app.animation_assets import make_sprite
+    from app.gesture_responder import blend_sprite
+    from app.screen_camera_and_subtitles import add_user_preview, add_subtitles
+    from app.text_layer_cache import draw_text
+    from app.config import FONT, FONT_SIZE_LARGE, COLOR_YELLOW, FONT_THICKNESS
+
+    rng = np.random.default_rng(0)
+    camera_frame = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    background = rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+    rgba = rng.integers(0, 255, (1024, 1024, 4), dtype=np.uint8)
+
+    compositor = FrameCompositor(background=background)
+    sprite = make_sprite(rgba, 0.3)
+    rgb_buffer = frame_pool.get("rgb", camera_frame.shape)
+
+    def render_one_frame():
+        cv2.flip(camera_frame, 1, dst=frame_pool.get("mirrored", camera_frame.shape))
+        cv2.cvtColor(camera_frame, cv2.COLOR_BGR2RGB, dst=rgb_buffer)
+        display = compositor.begin(display_size(camera_frame))
+        blend_sprite(display, sprite, 80, display.shape[0] // 2 - 70)
+        draw_text(display, "Thumbs Up detected!", (20, 50), FONT, FONT_SIZE_LARGE, COLOR_YELLOW, FONT_THICKNESS)
+        add_user_preview(display, camera_frame)
+        add_subtitles(display, "Hello Lucia, you are recognized as an Elderly user.")
+        return display
+
+    for _ in range(10):  # warm-up: fill every pool and cache
+        render_one_frame()
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for _ in range(200):
+        render_one_frame()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    frame_bytes = camera_frame.nbytes
+    extra = peak - baseline
+    print(f"Peak extra memory during 200 frames: {extra / 2**10:.1f} KiB (one camera frame is {frame_bytes / 2**10:.1f} KiB)")
+    if extra >= frame_bytes // 4:
+        print("❌ Steady-state rendering still allocates frame-sized arrays.")
+        sys.exit(1)
+    print("✅ No frame-sized allocations in steady state.")
@@ -0,0 +1,118 @@
+import threading
+import cv2
+import numpy as np
+
+from app.config import WINDOW_NAME, WINDOW_WIDTH, WINDOW_HEIGHT
+
+class FrameSink:
+    """
+    Where composed frames go. show() returns False when the user asked to quit.
+    fps is the rate loops that produce frames on their own (e.g. the goodbye screen) should keep.
+    """
+
+    fps = 30.0
+
+    def show(self, frame):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class WindowSink(FrameSink):
+    """
+    On-screen window (the normal app). Pressing q quits.
+    """
+
+    def __init__(self, name=WINDOW_NAME, size=(WINDOW_WIDTH, WINDOW_HEIGHT)):
+        self.name = name
+        cv2.namedWindow(name, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(name, *size)
+
+    def show(self, frame):
+        cv2.imshow(self.name, frame)
+        return not (cv2.waitKey(1) & 0xFF == ord('q'))
+
+    def close(self):
+        cv2.destroyWindow(self.name)
+
+class NullSink(FrameSink):
+    """
+    Drops every frame; for measuring pure pipeline throughput.
+    """
+
+    def __init__(self):
+        self.frames = 0
+
+    def show(self, frame):
+        self.frames += 1
+        return True
+
+class VideoFileSink(FrameSink):
+    """
+    Writes frames to a video file. The writer is opened on the first frame,
+    once the frame size is known.
+    """
+
+    def __init__(self, path, fps=30.0, fourcc="mp4v"):
+        self.path = path
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self._writer = None
+
+    def show(self, frame):
+        if self._writer is None:
+            h, w = frame.shape[:2]
+            self._writer = cv2.VideoWriter(self.path, self.fourcc, self.fps, (w, h))
+        self._writer.write(frame)
+        return True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+class SharedBufferSink(FrameSink):
+    """
+    Keeps a copy of the newest frame in a reused buffer, for another thread
+    (e.g. a network streamer) to pick up with latest().
+    """
+
+    def __init__(self):
+        self._buffer = None
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def show(self, frame):
+        with self._cond:
+            if self._buffer is None or self._buffer.shape != frame.shape:
+                self._buffer = np.empty_like(frame)
+            np.copyto(self._buffer, frame)
+            self._seq += 1
+            self._cond.notify_all()
+        return True
+
+    def latest(self, after_seq=0, timeout=None):
+        """
+        Return (seq, copy of the newest frame) once a frame newer than after_seq exists,
+        or (seq, None) on timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after_seq, timeout):
+                return self._seq, None
+            return self._seq, self._buffer.copy()
+
+def create_sink(kind="window", path=None, fps=30.0):
+    """
+    Build a sink by name: "window", "file" (needs path), "null" or "shared".
+    """
+    if kind == "window":
+        return WindowSink()
+    if kind == "file":
+        if not path:
+            raise ValueError("The file sink needs an output path.")
+        return VideoFileSink(path, fps)
+    if kind == "null":
+        return NullSink()
+    if kind == "shared":
+        return SharedBufferSink()
+    raise ValueError(f"Unknown frame sink: {kind}")
@@ -1,47 +1,183 @@
 import cv2
 import os
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from glob import glob
-import numpy as np
+
+from app import clock
+from app.frame_pool import frame_pool
+from app.stage_timer import timings
+from app.animation_assets import (
+    make_sprite, load_compiled_animation, write_compiled_animation
+)
+
+REACTIONS_FOLDER = "reactions"
+DEFAULT_ANIMATION_SCALE = 0.3
 
 gesture_animations = {}
 
-def load_gesture_animation(gesture_name):
-    if gesture_name in gesture_animations:
-        return gesture_animations[gesture_name]
+# Decoded PNGs by normalized path, so no file is ever decoded twice
+_decoded_frames = {}
+_decode_lock = threading.Lock()
 
-    folder = os.path.join("reactions", gesture_name)
-    frame_paths = sorted(
+def gesture_frame_paths(gesture_name):
+    folder = os.path.join(REACTIONS_FOLDER, gesture_name)
+    return sorted(
         glob(os.path.join(folder, "frame_*.png")),
         key=lambda p: int(os.path.splitext(os.path.basename(p))[0].split('_')[-1])
     )
-    print(f"[DEBUG] Loading frames from: {folder}")
+
+def _decode_frame(path, executor=None):
+    """
+    Return a Future with the decoded frame. The first caller for a path decodes it
+    (on the executor if given); everyone after that shares the same Future.
+    """
+    key = os.path.normcase(os.path.abspath(path))
+    with _decode_lock:
+        future = _decoded_frames.get(key)
+        if future is not None:
+            return future
+        if executor is not None:
+            future = executor.submit(cv2.imread, path, cv2.IMREAD_UNCHANGED)
+            _decoded_frames[key] = future
+            return future
+        future = Future()
+        _decoded_frames[key] = future
+
+    future.set_result(cv2.imread(path, cv2.IMREAD_UNCHANGED))
+    return future
+
+def load_gesture_animation(gesture_name):
+    if gesture_name in gesture_animations:
+        return gesture_animations[gesture_name]
+
+    frame_paths = gesture_frame_paths(gesture_name)
+    print(f"[DEBUG] Loading frames from: {os.path.join(REACTIONS_FOLDER, gesture_name)}")
     print(f"[DEBUG] Found {len(frame_paths)} frame(s): {frame_paths}")
 
-    frames = [cv2.imread(p, cv2.IMREAD_UNCHANGED) for p in frame_paths if cv2.imread(p, cv2.IMREAD_UNCHANGED) is not None]
+    decoded = [_decode_frame(p).result() for p in frame_paths]
+    frames = [frame for frame in decoded if frame is not None]
     gesture_animations[gesture_name] = frames
     return frames
 
-def overlay_gesture_animation(base_frame, gesture_name, start_time, duration=2, scale=0.3, **kwargs):
-    frames = load_gesture_animation(gesture_name)
-    if not frames:
-        return base_frame
+def preload_gesture_animations(scale=DEFAULT_ANIMATION_SCALE, max_workers=4):
+    """
+    Decode every animation under reactions/ in a thread pool and build its sprites,
+    so the first reaction of each kind does not stall the UI.
+    Prints progress per animation and a memory summary at the end.
+    """
+    start = time.time()
+    names = sorted(
+        name for name in os.listdir(REACTIONS_FOLDER)
+        if os.path.isdir(os.path.join(REACTIONS_FOLDER, name)) and gesture_frame_paths(name)
+    )
 
-    elapsed = time.time() - start_time
-    total_frames = len(frames)
-    frame_index = int((elapsed / duration) * total_frames) % total_frames
-    frame = frames[frame_index]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AnimationPreload") as pool:
+        # Queue every file that has no up-to-date compiled asset, so all decoding happens in parallel
+        for name in names:
+            frame_paths = gesture_frame_paths(name)
+            if load_compiled_animation(name, frame_paths, scale) is None:
+                for path in frame_paths:
+                    _decode_frame(path, pool)
 
-    if frame.shape[2] == 4:
-        alpha_channel = frame[:, :, 3] / 255.0
-        rgb_frame = frame[:, :, :3]
-    else:
-        alpha_channel = None
-        rgb_frame = frame
+        for n, name in enumerate(names, 1):
+            sprites = load_gesture_sprites(name, scale)
+            print(f"[PRELOAD] {n}/{len(names)} {name}: {len(sprites)} frame(s)")
 
-    rgb_frame = cv2.resize(rgb_frame, (0, 0), fx=scale, fy=scale)
-    h, w, _ = rgb_frame.shape
+    decoded_bytes = sum(f.nbytes for frames in gesture_animations.values() for f in frames)
+    sprite_bytes = sum(s.nbytes for sprites in gesture_sprites.values() for s in sprites)
+    print(f"✅ Preloaded {len(names)} animation(s) in {time.time() - start:.1f}s: "
+          f"{decoded_bytes / 2**20:.1f} MB decoded frames kept, {sprite_bytes / 2**20:.1f} MB of sprites "
+          f"(memory-mapped where compiled).")
+
+def start_animation_preload(scale=DEFAULT_ANIMATION_SCALE):
+    """
+    Run preload_gesture_animations on a background thread.
+    """
+    thread = threading.Thread(target=preload_gesture_animations, args=(scale,), daemon=True)
+    thread.start()
+    return thread
+
+# (gesture_name, scale) -> list of Sprites
+gesture_sprites = {}
+
+# (gesture_name, scale) -> Future of its sprites, so the preload and render threads
+# never compile the same animation twice
+_sprite_futures = {}
+_sprite_lock = threading.Lock()
+
+def load_gesture_sprites(gesture_name, scale):
+    """
+    Return the sprites of an animation. They come memory-mapped from the compiled
+    asset when it is up to date; otherwise the PNGs are decoded once, compiled,
+    and the decoded full-resolution frames are released.
+    """
+    key = (gesture_name, scale)
+    with _sprite_lock:
+        future = _sprite_futures.get(key)
+        owner = future is None
+        if owner:
+            future = _sprite_futures[key] = Future()
+    if not owner:
+        return future.result()
+
+    try:
+        sprites = _build_gesture_sprites(gesture_name, scale)
+    except Exception as e:
+        with _sprite_lock:
+            _sprite_futures.pop(key, None)  # Let a later call try again
+        future.set_exception(e)
+        raise
+
+    gesture_sprites[key] = sprites
+    future.set_result(sprites)
+    return sprites
+
+def _build_gesture_sprites(gesture_name, scale):
+    frame_paths = gesture_frame_paths(gesture_name)
+    sprites = load_compiled_animation(gesture_name, frame_paths, scale)
+    if sprites is None:
+        sprites = [make_sprite(f, scale) for f in load_gesture_animation(gesture_name)]
+        if write_compiled_animation(gesture_name, frame_paths, scale, sprites):
+            sprites = load_compiled_animation(gesture_name, frame_paths, scale) or sprites
+            _release_decoded_frames(gesture_name, frame_paths)
+    return sprites
+
+def _release_decoded_frames(gesture_name, frame_paths):
+    # The compiled asset replaces the full-resolution RGBA frames
+    gesture_animations.pop(gesture_name, None)
+    with _decode_lock:
+        for path in frame_paths:
+            _decoded_frames.pop(os.path.normcase(os.path.abspath(path)), None)
+
+def blend_sprite(base_frame, sprite, x, y):
+    """
+    Blend a sprite into base_frame at (x, y), in place.
+    """
+    h, w = sprite.color.shape[:2]
+    roi = base_frame[y:y+h, x:x+w]
+    if sprite.inv_alpha is None:
+        roi[:] = sprite.color
+        return
+
+    # Blend in a pooled scratch buffer, so no sprite-sized array is allocated per frame
+    blended = frame_pool.get("sprite_blend", roi.shape)
+    cv2.multiply(roi, sprite.inv_alpha[:roi.shape[0], :roi.shape[1]], dst=blended, scale=1 / 255.0)
+    cv2.add(blended, sprite.color[:roi.shape[0], :roi.shape[1]], dst=blended)
+    roi[:] = blended
+
+def overlay_gesture_animation(base_frame, gesture_name, start_time, duration=2, scale=DEFAULT_ANIMATION_SCALE, **kwargs):
+    sprites = load_gesture_sprites(gesture_name, scale)
+    if not sprites:
+        return base_frame
+
+    elapsed = clock.now() - start_time
+    total_frames = len(sprites)
+    frame_index = int((elapsed / duration) * total_frames) % total_frames
+    sprite = sprites[frame_index]
 
+    h, w = sprite.color.shape[:2]
     base_h, base_w, _ = base_frame.shape
 
     # ✅ Fixed avatar position (consistent with main.py)
@@ -52,21 +188,14 @@ def overlay_gesture_animation(base_frame, gesture_name, start_time, duration=2,
     y = max(0, min(y, base_h - h))
 
     try:
-        if alpha_channel is not None:
-            alpha_channel = cv2.resize(alpha_channel, (w, h))
-            for c in range(3):
-                base_frame[y:y+h, x:x+w, c] = (
-                    alpha_channel * rgb_frame[:, :, c] +
-                    (1 - alpha_channel) * base_frame[y:y+h, x:x+w, c]
-                ).astype(np.uint8)
-        else:
-            base_frame[y:y+h, x:x+w] = rgb_frame
+        blend_sprite(base_frame, sprite, x, y)
     except Exception as e:
         print(f"[ERROR] Failed to overlay image: {e}")
 
     return base_frame
 
-def overlay_centered_animation(base_frame, gesture_name, start_time, duration=2.5, scale=0.3):
+@timings.timed("overlay_animation")
+def overlay_centered_animation(base_frame, gesture_name, start_time, duration=2.5, scale=DEFAULT_ANIMATION_SCALE):
     """
     Always uses fixed position and delegates to overlay_gesture_animation.
     Makes main.py simpler and consistent.
@@ -1,58 +1,48 @@
-import cv2
-import mediapipe as mp
-import math
+import numpy as np
 from collections import deque
 
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=2)
+from app.landmark_service import landmarks
+from app.landmark_extraction import WRIST, MIDDLE_TIP
+from app.stage_timer import timings
+
 wave_buffers = [deque(maxlen=5), deque(maxlen=5)]
 still_counters = [0, 0]
 
+# Result for the last frame, so several callers in one frame share it
+_last_wave = (None, False)
+
 def detect_wave(frame):
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb)
-
-    if result.multi_hand_landmarks and result.multi_handedness:
-        for idx, handLms in enumerate(result.multi_hand_landmarks):
-            if idx >= 2:
-                continue
-
-            handedness = result.multi_handedness[idx].classification[0].label
-            lm_list = []
-            h, w, _ = frame.shape
-            for id, lm in enumerate(handLms.landmark):
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                lm_list.append((id, cx, cy))
-
-            # 5 fingers up?
-            finger_tips = [4, 8, 12, 16, 20]
-            fingers = []
-
-            if handedness == 'Right':
-                fingers.append(1 if lm_list[4][1] < lm_list[3][1] else 0)
-            else:
-                fingers.append(1 if lm_list[4][1] > lm_list[3][1] else 0)
-
-            for tip_id in finger_tips[1:]:
-                fingers.append(1 if lm_list[tip_id][2] < lm_list[tip_id - 2][2] else 0)
-
-            total_fingers = sum(fingers)
-
-            wrist = next((x for x in lm_list if x[0] == 0), None)
-            middle_tip = next((x for x in lm_list if x[0] == 12), None)
-            if wrist:
-                wave_buffers[idx].append(wrist[1])
-
-            waving = False
-            if wrist and middle_tip and len(wave_buffers[idx]) == wave_buffers[idx].maxlen:
-                hand_height = abs(wrist[2] - middle_tip[2]) + 1
-                pixel_diff = max(wave_buffers[idx]) - min(wave_buffers[idx])
-                scaled_diff = pixel_diff / hand_height
-                if scaled_diff > 0.05:
-                    waving = True
-
-            if total_fingers == 5:
-                if waving:
-                    return True  # Hi detected
+    """
+    Return True if an open hand is waving. Evaluated once per frame; repeated
+    calls for the same frame return the cached answer without touching the
+    wrist buffers again.
+    """
+    global _last_wave
+    hands = landmarks.hand_set(frame)
+    if _last_wave[0] == landmarks.frame_id:
+        return _last_wave[1]
+
+    waving_hand = _detect_wave(hands)
+    _last_wave = (landmarks.frame_id, waving_hand)
+    return waving_hand
+
+@timings.timed("detect_wave")
+def _detect_wave(hands):
+    if hands.count == 0:
+        return False
+
+    pts = hands.points[:hands.count]
+    all_fingers_up = hands.fingers_up().all(axis=1)
+    # Hand height (wrist to middle tip) scales the sideways wrist motion
+    hand_heights = np.abs(pts[:, WRIST, 1] - pts[:, MIDDLE_TIP, 1]) + 1
+
+    for idx in range(hands.count):
+        buffer = wave_buffers[idx]
+        buffer.append(int(pts[idx, WRIST, 0]))
+
+        if len(buffer) == buffer.maxlen and all_fingers_up[idx]:
+            scaled_diff = (max(buffer) - min(buffer)) / hand_heights[idx]
+            if scaled_diff > 0.05:
+                return True  # Hi detected
 
     return False  # No Hi
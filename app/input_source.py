@@ -0,0 +1,59 @@
+import json
+
+class ConsoleInput:
+    """
+    Answers typed on the keyboard (the normal app).
+    """
+
+    def ask(self, prompt):
+        return input(prompt)
+
+class ScriptedInput:
+    """
+    Answers given in advance, handed out in order. Used for headless runs and
+    benchmarks, where nobody is at the keyboard. When the script runs out, the
+    default answer is returned, or EOFError is raised (like input() on a closed
+    stdin) if there is no default.
+    """
+
+    def __init__(self, answers, default=None):
+        self.answers = list(answers)
+        self.default = default
+        self.asked = []
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load answers from a JSON list, e.g. ["maria", "1", "3 PM"], or for a family
+        member or caregiver ["tom", "2", "maria", "3 PM"] (whom they look after comes third).
+        """
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def ask(self, prompt):
+        if self.answers:
+            answer = self.answers.pop(0)
+        elif self.default is not None:
+            answer = self.default
+        else:
+            raise EOFError("No scripted answer left")
+        self.asked.append((prompt, answer))
+        print(f"{prompt}{answer}")
+        return answer
+
+_source = ConsoleInput()
+
+def ask(prompt):
+    """
+    Ask the user a question through the active input source.
+    """
+    return _source.ask(prompt)
+
+def use_input(source):
+    """
+    Make source the active input source. Returns the previous one.
+    """
+    global _source
+    previous = _source
+    _source = source
+    return previous
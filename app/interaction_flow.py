@@ -1,18 +1,19 @@
 import threading
 import time
-import cv2
 
+from app import clock
 from app.new_user_registration import handle_new_user_registration
 from app.conversation_manager import greet_user_by_role
 from app.gesture_responder import overlay_centered_animation
 from app.text_to_speech import speak_text
+from app.compositor import compositor, display_size
+from app.text_layer_cache import draw_text
 
 from app.config import (
     FONT, FONT_SIZE_LARGE, FONT_SIZE_MEDIUM, FONT_SIZE_SMALL, FONT_THICKNESS, FONT_THICKNESS_GESTURE,
     COLOR_YELLOW, COLOR_GRAY, COLOR_PINK,
     IDLE_ANIMATION_NAME, GESTURE_DISPLAY_DURATION,
-    GESTURE_START_DELAY, SHOW_WAVE_MESSAGE_DURATION,
-    RAW_BACKGROUND
+    GESTURE_START_DELAY, SHOW_WAVE_MESSAGE_DURATION, GOODBYE_MESSAGE
 )
 
 def check_for_registration_trigger(has_unrecognized_face, recognized, state, current_time, unrecognized_start_time, recognition_timeout):
@@ -39,27 +40,38 @@ def check_for_registration_trigger(has_unrecognized_face, recognized, state, cur
 def check_wave_and_start_registration(frame, state):
     """
     If waving and waiting to register, start the registration process.
+    Returns True when the registration wave was seen.
     """
     from app.hi_wave_detector import detect_wave
 
     if state.awaiting_wave and detect_wave(frame):
+        state.awaiting_wave = False
+        if not state.registration_enabled:
+            return True
         print("👋 Wave detected from unrecognized user. Starting registration.")
         state.show_typing_prompt = True
         state.registration_in_progress = True
-        state.awaiting_wave = False
         threading.Thread(
             target=run_registration_flow,
             args=(frame.copy(), state)
         ).start()
+        return True
+    return False
 
 def run_registration_flow(frame, state):
     """
     Handle user input and complete new user registration.
+    The new face is enrolled into the live gallery, so the main loop keeps running.
     """
-    handle_new_user_registration(frame)
-    print("🔄 Registration complete. Requesting system restart...")
-    time.sleep(1)
-    state.request_restart = True
+    try:
+        handle_new_user_registration(frame, get_latest_frame=state.get_latest_frame)
+        print("🔄 Registration complete. Back to normal operation.")
+    except EOFError:
+        print("⚠️ Registration cancelled: no more input.")
+    finally:
+        state.show_typing_prompt = False
+        state.registration_in_progress = False
+        state.idle_start_time = clock.now()
 
 def start_interaction_if_wave(frame, faces, interaction_started, current_time):
     """
@@ -84,8 +96,8 @@ def draw_interaction_status(black_frame, current_time, interaction_start_time, l
     if interaction_start_time:
         time_since_start = current_time - interaction_start_time
         if time_since_start < SHOW_WAVE_MESSAGE_DURATION:
-            cv2.putText(black_frame, "Hi detected!", (20, 50),
-                        FONT, FONT_SIZE_LARGE, COLOR_YELLOW, FONT_THICKNESS_GESTURE)
+            draw_text(black_frame, "Hi detected!", (20, 50),
+                      FONT, FONT_SIZE_LARGE, COLOR_YELLOW, FONT_THICKNESS_GESTURE)
             black_frame = overlay_centered_animation(
                 black_frame,
                 "Speaking",
@@ -99,8 +111,8 @@ def draw_interaction_status(black_frame, current_time, interaction_start_time, l
                     IDLE_ANIMATION_NAME,
                     state.idle_start_time
                 )
-            cv2.putText(black_frame, "Interaction Running...", (180, 20),
-                        FONT, FONT_SIZE_SMALL, COLOR_GRAY, FONT_THICKNESS)
+            draw_text(black_frame, "Interaction Running...", (180, 20),
+                      FONT, FONT_SIZE_SMALL, COLOR_GRAY, FONT_THICKNESS)
 
     if state.show_typing_prompt:
         black_frame = overlay_centered_animation(
@@ -113,30 +125,39 @@ def draw_interaction_status(black_frame, current_time, interaction_start_time, l
 
     return black_frame
 
-def handle_goodbye_wave(frame, full_frame, cap):
+GOODBYE_MAX_WAIT = 15.0  # Seconds the goodbye screen may stay up at most
+
+def handle_goodbye_wave(frame, full_frame, cap, sink=None):
     """
-    Show goodbye animation and speak farewell message before closing.
+    Show goodbye animation (on the given frame sink, the window by default)
+    and speak farewell message. The caller then shuts down (camera, sink, stats).
     """
-    from app.subtitle_manager import update_subtitle
     from app.screen_camera_and_subtitles import add_subtitles
     from app.gesture_responder import overlay_centered_animation
-    from app.text_to_speech import speak_text
-    import threading
+    from app.text_to_speech import speech, speak_async, PRIORITY_HIGH
+    from app.frame_sink import WindowSink
+    from concurrent.futures import wait
+
+    own_sink = sink is None
+    sink = sink or WindowSink()
 
     print("👋 Goodbye wave detected.")
 
-    message = "Take care and have a lovely day. I will see you again soon!."
-    update_subtitle(message)
+    message = GOODBYE_MESSAGE
 
-    # 🗣️ Start speech in parallel
-    tts_thread = threading.Thread(target=speak_text, args=(message,))
-    tts_thread.start()
+    # 🗣️ Drop anything still queued and say goodbye next
+    speech.cancel_pending()
+    goodbye_speech = speak_async(message, priority=PRIORITY_HIGH)
 
-    start_time = time.time()
+    start_time = clock.now()
     max_duration = 4.0  # Total allowed display time
+    frame_interval = 1.0 / sink.fps
+    # Hard limit in wall time, so a stuck (or simulated-clock) run never waits forever for speech
+    deadline = time.monotonic() + GOODBYE_MAX_WAIT
 
-    while time.time() - start_time < max_duration or tts_thread.is_alive():
-        goodbye_frame = cv2.resize(RAW_BACKGROUND, (int(frame.shape[1] * 0.8), frame.shape[0]))
+    while (clock.now() - start_time < max_duration or not goodbye_speech.done()) and time.monotonic() < deadline:
+        frame_start = clock.now()
+        goodbye_frame = compositor.begin(display_size(frame))
 
         goodbye_frame = overlay_centered_animation(
             goodbye_frame,
@@ -147,15 +168,14 @@ def handle_goodbye_wave(frame, full_frame, cap):
 
         goodbye_frame = add_subtitles(goodbye_frame, message)
 
-        cv2.imshow("Face + Gesture Recognition", goodbye_frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if not sink.show(goodbye_frame):
             break
 
-    # ✅ Make sure speech is done
-    if tts_thread.is_alive():
-        tts_thread.join(timeout=1.0)
+        # One frame per sink frame interval: recordings keep real length, null sinks do not spin
+        clock.sleep(max(0.0, frame_interval - (clock.now() - frame_start)))
 
-    cap.release()
-    cv2.destroyAllWindows()
+    # ✅ Make sure speech is done
+    wait([goodbye_speech], timeout=1.0)
+    if own_sink:
+        sink.close()
     print("👋 Interaction closed.")
-    exit(0)
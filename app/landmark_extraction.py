@@ -0,0 +1,138 @@
+import numpy as np
+
+# FaceMesh indices used by the gesture rules
+MOUTH_TOP = 13
+LEFT_EYE_POINTS = [33, 145, 159]
+RIGHT_EYE_POINTS = [263, 374, 386]
+LEFT_EAR_POINTS = [234, 93]
+RIGHT_EAR_POINTS = [454, 323]
+
+# All of them in one gather list, with the slice each group occupies
+FACE_POINT_INDICES = [MOUTH_TOP] + LEFT_EYE_POINTS + RIGHT_EYE_POINTS + LEFT_EAR_POINTS + RIGHT_EAR_POINTS
+MOUTH_SLICE = slice(0, 1)
+LEFT_EYE_SLICE = slice(1, 4)
+RIGHT_EYE_SLICE = slice(4, 7)
+LEFT_EAR_SLICE = slice(7, 9)
+RIGHT_EAR_SLICE = slice(9, 11)
+
+NUM_HAND_POINTS = 21
+MAX_HANDS = 2
+
+# Hand landmark indices
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_TIP = 8
+MIDDLE_TIP = 12
+PINKY_TIP = 20
+FINGER_TIPS = np.array([8, 12, 16, 20])       # Index, middle, ring, pinky
+FINGER_PIPS = FINGER_TIPS - 2                  # The joint each tip is compared against
+
+class HandSet:
+    """
+    Up to two hands from one frame, stored as arrays:
+    points is (2, 21, 2) int32 pixel coordinates, is_right is (2,) bool,
+    and count says how many of the slots are filled.
+    """
+
+    __slots__ = ("points", "is_right", "count", "_fingers_up")
+
+    def __init__(self, points, is_right, count):
+        self.points = points
+        self.is_right = is_right
+        self.count = count
+        self._fingers_up = None
+
+    def fingers_up(self):
+        """
+        (count, 5) bool array: thumb, index, middle, ring, pinky extended.
+        The thumb is judged sideways (mirrored by handedness), the others by tip above joint.
+        """
+        if self._fingers_up is None:
+            pts = self.points[:self.count]
+            thumb_x, thumb_ip_x = pts[:, THUMB_TIP, 0], pts[:, THUMB_IP, 0]
+            thumb = np.where(self.is_right[:self.count], thumb_x < thumb_ip_x, thumb_x > thumb_ip_x)
+            others = pts[:, FINGER_TIPS, 1] < pts[:, FINGER_PIPS, 1]
+            self._fingers_up = np.column_stack((thumb, others))
+        return self._fingers_up
+
+def hands_from_result(result, width, height):
+    """
+    Build a HandSet from a MediaPipe Hands result (at most MAX_HANDS hands).
+    """
+    points = np.zeros((MAX_HANDS, NUM_HAND_POINTS, 2), dtype=np.int32)
+    is_right = np.zeros(MAX_HANDS, dtype=bool)
+    count = 0
+
+    if result.multi_hand_landmarks and result.multi_handedness:
+        for handLms, handInfo in zip(result.multi_hand_landmarks, result.multi_handedness):
+            if count == MAX_HANDS:
+                break
+            points[count] = hand_points_px(handLms, width, height)
+            is_right[count] = handInfo.classification[0].label == 'Right'
+            count += 1
+
+    return HandSet(points, is_right, count)
+
+def landmarks_to_pixels(landmarks, indices, width, height):
+    """
+    Gather only the requested landmark indices and convert them to pixel
+    coordinates in one vectorized step. Returns an (len(indices), 2) int32 array.
+    """
+    normalized = np.array([(landmarks[i].x, landmarks[i].y) for i in indices], dtype=np.float64)
+    return (normalized * (width, height)).astype(np.int32)
+
+def face_points_px(face_landmarks, width, height):
+    """
+    Pixel positions of the mouth, eye and ear points of one FaceMesh face,
+    ordered as FACE_POINT_INDICES.
+    """
+    return landmarks_to_pixels(face_landmarks.landmark, FACE_POINT_INDICES, width, height)
+
+def hand_points_px(hand_landmarks, width, height):
+    """
+    Pixel positions of all 21 hand landmarks as a (21, 2) int32 array.
+    """
+    return landmarks_to_pixels(hand_landmarks.landmark, range(NUM_HAND_POINTS), width, height)
+
+# Micro-benchmark: index-only extraction vs. walking all 468 FaceMesh points
+if __name__ == "__main__":
+    import time
+    from types import SimpleNamespace
+
+    rng = np.random.default_rng(0)
+    fake_face = SimpleNamespace(landmark=[
+        SimpleNamespace(x=float(x), y=float(y)) for x, y in rng.random((468, 2))
+    ])
+    w, h = 640, 480
+    repeats = 5000
+
+    def full_loop(face_lms):
+        mouth_pos = None
+        left_eye, right_eye, left_ear, right_ear = [], [], [], []
+        for i, lm in enumerate(face_lms.landmark):
+            cx, cy = int(lm.x * w), int(lm.y * h)
+            if i == MOUTH_TOP:
+                mouth_pos = (cx, cy)
+            if i in LEFT_EYE_POINTS:
+                left_eye.append((cx, cy))
+            if i in RIGHT_EYE_POINTS:
+                right_eye.append((cx, cy))
+            if i in LEFT_EAR_POINTS:
+                left_ear.append((cx, cy))
+            if i in RIGHT_EAR_POINTS:
+                right_ear.append((cx, cy))
+        return mouth_pos, left_eye, right_eye, left_ear, right_ear
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        full_loop(fake_face)
+    loop_us = (time.perf_counter() - start) / repeats * 1e6
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        face_points_px(fake_face, w, h)
+    indexed_us = (time.perf_counter() - start) / repeats * 1e6
+
+    print(f"Full 468-point loop:  {loop_us:8.1f} µs/frame")
+    print(f"Index-only gather:    {indexed_us:8.1f} µs/frame ({loop_us / indexed_us:.1f}x faster)")
@@ -0,0 +1,86 @@
+import cv2
+import mediapipe as mp
+
+from app.landmark_extraction import hands_from_result
+from app.frame_pool import frame_pool
+from app.stage_timer import timings
+
+mp_hands = mp.solutions.hands
+mp_face = mp.solutions.face_mesh
+
+class LandmarkService:
+    """
+    Runs MediaPipe once per frame and shares the result with every consumer.
+
+    Wave detection, registration triggers and gesture classification all ask this
+    service for landmarks instead of owning their own Hands instance, so Hands runs
+    at most once per frame and keeps a single, consistent tracking state.
+    FaceMesh is only created and run when a consumer actually asks for face landmarks.
+    """
+
+    def __init__(self, max_num_hands=2):
+        self._hands = mp_hands.Hands(max_num_hands=max_num_hands)
+        self._face_mesh = None
+        self.frame_id = 0
+        self._frame = None
+        self._rgb = None
+        self._hands_result = None
+        self._hand_set = None
+        self._face_result = None
+
+    def new_frame(self, frame):
+        """
+        Start a new frame: drop the cached results of the previous one.
+        """
+        self.frame_id += 1
+        self._frame = frame
+        self._rgb = None
+        self._hands_result = None
+        self._hand_set = None
+        self._face_result = None
+
+    def hands(self, frame):
+        """
+        Return the MediaPipe Hands result for this frame, running it only once.
+        """
+        self._ensure_frame(frame)
+        if self._hands_result is None:
+            with timings.stage("landmarks.hands"):
+                self._hands_result = self._hands.process(self._rgb_frame())
+        return self._hands_result
+
+    def hand_set(self, frame):
+        """
+        Return this frame's hands as a HandSet (pixel-space arrays), built only once.
+        """
+        result = self.hands(frame)
+        if self._hand_set is None:
+            h, w = frame.shape[:2]
+            self._hand_set = hands_from_result(result, w, h)
+        return self._hand_set
+
+    def face(self, frame):
+        """
+        Return the MediaPipe FaceMesh result for this frame, running it only once.
+        """
+        self._ensure_frame(frame)
+        if self._face_result is None:
+            if self._face_mesh is None:
+                self._face_mesh = mp_face.FaceMesh()
+            with timings.stage("landmarks.face_mesh"):
+                self._face_result = self._face_mesh.process(self._rgb_frame())
+        return self._face_result
+
+    def _ensure_frame(self, frame):
+        # Callers outside the main loop may not call new_frame() themselves
+        if frame is not self._frame:
+            self.new_frame(frame)
+
+    def _rgb_frame(self):
+        if self._rgb is None:
+            self._rgb = frame_pool.get("landmarks_rgb", self._frame.shape)
+            cv2.cvtColor(self._frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+# Shared instance used by the whole app
+landmarks = LandmarkService()
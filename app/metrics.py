@@ -0,0 +1,141 @@
+import os
+import time
+import threading
+from collections import defaultdict
+
+from app.config import METRICS_PORT, METRICS_ADDRESS
+
+# Optional: the exporter only runs when prometheus_client is installed
+try:
+    from prometheus_client import CollectorRegistry, start_http_server
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:
+    CollectorRegistry = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PREFIX = "kiosk"
+
+# Event counters: name -> (help text, label name)
+COUNTERS = {
+    "face_matches": ("Faces matched against the gallery, by result", "result"),
+    "gestures": ("Stable gestures detected, by gesture", "gesture"),
+    "interactions": ("Interaction events (greeting, registration, goodbye)", "event"),
+}
+
+class MetricsRecorder:
+    """
+    In-process counters for the hot paths: inc() is a single dict update, no locks
+    and no Prometheus objects. Everything is turned into metrics only when the
+    endpoint is scraped, together with the stats() of registered sources
+    (camera, recognition worker, speech worker, ...).
+    """
+
+    def __init__(self):
+        self._counts = defaultdict(int)   # (name, label) -> count
+        self._sources = {}                # name -> callable returning a dict of numbers
+
+    def inc(self, name, label="", amount=1):
+        self._counts[(name, label)] += amount
+
+    def add_source(self, name, stats):
+        self._sources[name] = stats
+
+    def counts(self):
+        return self._counts.copy()
+
+    def sources(self):
+        """
+        Call every source; a failing source is skipped for this scrape.
+        """
+        values = {}
+        for name, stats in list(self._sources.items()):
+            try:
+                values[name] = stats()
+            except Exception as e:
+                print(f"[ERROR] Metrics source '{name}' failed: {e}")
+        return values
+
+class _Collector:
+    """
+    Builds all metric families at scrape time (runs on the exporter's thread).
+    """
+
+    def __init__(self, recorder, timings=None):
+        self.recorder = recorder
+        self.timings = timings
+        self._process = psutil.Process(os.getpid()) if psutil else None
+        self._last_frames = None
+        self._last_scrape = None
+        self._lock = threading.Lock()
+
+    def collect(self):
+        counts = self.recorder.counts()
+        for name, (help_text, label) in COUNTERS.items():
+            family = CounterMetricFamily(f"{PREFIX}_{name}", help_text, labels=[label])
+            for (counter, value_label), value in counts.items():
+                if counter == name:
+                    family.add_metric([value_label], value)
+            yield family
+
+        matches = {label: value for (name, label), value in counts.items() if name == "face_matches"}
+        total_matches = sum(matches.values())
+        if total_matches:
+            yield GaugeMetricFamily(f"{PREFIX}_recognition_hit_rate",
+                                    "Share of matched faces that were recognized",
+                                    value=matches.get("recognized", 0) / total_matches)
+
+        sources = self.recorder.sources()
+        frames = sources.get("pipeline", {}).get("frames")
+        if frames is not None:
+            yield from self._fps(frames)
+
+        for source, values in sources.items():
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    yield GaugeMetricFamily(f"{PREFIX}_{source}_{key}", f"{source} stats: {key}", value=value)
+
+        if self._process is not None:
+            memory = self._process.memory_info()
+            yield GaugeMetricFamily(f"{PREFIX}_memory_rss_bytes", "Resident memory of the app", value=memory.rss)
+
+        if self.timings is not None and self.timings.enabled:
+            family = GaugeMetricFamily(f"{PREFIX}_stage_latency_seconds",
+                                       "Per-stage latency percentiles since start",
+                                       labels=["stage", "quantile"])
+            for stage, summary in self.timings.summary().items():
+                for q in ("p50", "p95", "p99"):
+                    if summary[f"{q}_ms"] is not None:
+                        family.add_metric([stage, q], summary[f"{q}_ms"] / 1000)
+            yield family
+
+    def _fps(self, frames):
+        with self._lock:
+            now = time.time()
+            fps = None
+            if self._last_frames is not None and now > self._last_scrape:
+                fps = (frames - self._last_frames) / (now - self._last_scrape)
+            self._last_frames, self._last_scrape = frames, now
+        yield CounterMetricFamily(f"{PREFIX}_frames", "Frames processed by the main loop", value=frames)
+        if fps is not None:
+            yield GaugeMetricFamily(f"{PREFIX}_fps", "Frames per second since the previous scrape", value=fps)
+
+def start_metrics_server(port=METRICS_PORT, address=METRICS_ADDRESS, timings=None):
+    """
+    Serve /metrics on address:port from a background thread.
+    Returns False (and the app keeps running) when prometheus_client is missing.
+    """
+    if CollectorRegistry is None:
+        print("⚠️ prometheus_client is not installed, metrics are disabled.")
+        return False
+    registry = CollectorRegistry()
+    registry.register(_Collector(metrics, timings))
+    start_http_server(port, addr=address, registry=registry)
+    print(f"📈 Metrics on http://{address}:{port}/metrics")
+    return True
+
+# Shared recorder for the whole app
+metrics = MetricsRecorder()
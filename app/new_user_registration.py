@@ -2,56 +2,51 @@
 
 import os
 import cv2
-import threading
 import time
 
-from app.role_database import USER_ROLES, save_roles
-from app.face_recognition import register_known_faces
-from app.text_to_speech import speak_text
-from app.subtitle_manager import update_subtitle
+from app.role_directory import directory, CARER_ROLES, ELDERLY_ROLE
+from app.face_recognition import enroll_face
+from app.text_to_speech import speak_async
+from app.input_source import ask
+from app.config import REGISTRATION_INTRO, PHOTO_PROMPT, REMINDER_PROMPT
+
+KNOWN_FACES_FOLDER = "known_faces"  # New users' photos (replay.py points this at a scratch folder)
 
 def speak_in_background(message: str):
-    thread = threading.Thread(target=speak_text, args=(message,))
-    thread.start()
+    return speak_async(message)
 
 def speak_multiple_lines_in_background(lines, delay=0.3):
-    def run():
-        for line in lines:
-            update_subtitle(line)
-            speak_text(line)
-            time.sleep(delay)
-    thread = threading.Thread(target=run)
-    thread.start()
-
-def save_new_face_image(_, name):
-    speak_in_background("Could you stay still for a moment? I will take a picture of you.")
+    for line in lines:
+        speak_async(line, pause_after=delay)
+
+def save_new_face_image(frame, name, get_latest_frame=None):
+    """
+    Take a picture of the new user from the running camera feed and save it.
+    get_latest_frame should return a private copy of the newest frame, so the
+    webcam does not have to be opened a second time. Returns (image, filename).
+    """
+    speak_in_background(PHOTO_PROMPT)
     time.sleep(5)
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("❌ Error: Cannot access webcam to take picture.")
-        return
 
-    ret, fresh_frame = cap.read()
-    cap.release()
+    latest_frame = get_latest_frame() if get_latest_frame else None
+    fresh_frame = latest_frame if latest_frame is not None else frame
 
-    if not ret:
+    if fresh_frame is None:
         print("❌ Failed to capture image.")
-        return
+        return None, None
 
-    fresh_frame = cv2.flip(fresh_frame, 1)
-    filename = os.path.join("known_faces", f"{name.lower()}.jpg")
+    os.makedirs(KNOWN_FACES_FOLDER, exist_ok=True)
+    filename = os.path.join(KNOWN_FACES_FOLDER, f"{name.lower()}.jpg")
     cv2.imwrite(filename, fresh_frame)
     print(f"✅ Image saved as {filename}")
+    return fresh_frame, filename
 
-def handle_new_user_registration(frame):
+def handle_new_user_registration(frame, get_latest_frame=None):
     print("Stage 1: Starting user registration")
-    speak_multiple_lines_in_background([
-        "Hi there! I am Luis. I do not recognize you yet. Your face is new to me.",
-        "Could you please type your name and role on the keyboard so we can get to know each other?"
-    ])
+    speak_multiple_lines_in_background(REGISTRATION_INTRO)
 
     print("Stage 2: Waiting for user input...")
-    name = input("Enter name for new user: ").strip().lower()
+    name = ask("Enter name for new user: ").strip().lower()
 
     valid_roles = {
         "1": "Elderly user",
@@ -65,23 +60,39 @@ def handle_new_user_registration(frame):
 
     role_input = None
     while role_input not in valid_roles:
-        role_input = input("Enter the number of the role (1–3): ").strip()
+        role_input = ask("Enter the number of the role (1–3): ").strip()
 
     role = valid_roles[role_input]
     print(f"✅ Name: {name}, Role: {role}")
 
+    # ✅ Family members and caregivers: ask whom they look after
+    looks_after = []
+    if role in CARER_ROLES:
+        elderly_users = directory.people_with_role(ELDERLY_ROLE)
+        print(f"Elderly users: {', '.join(sorted(elderly_users)) or 'none yet'}")
+        answer = ask("Who do you look after? Enter names separated by commas (leave empty for everyone): ")
+        for elderly in (part.strip().lower() for part in answer.split(",")):
+            if elderly in elderly_users:
+                looks_after.append(elderly)
+            elif elderly:
+                print(f"⚠️ {elderly} is not a registered elderly user; skipped.")
+
     # ✅ Ask for reminder time
-    speak_in_background("At what time should I remind you to take your medication? Please type it as for example 3 PM or 08:30 AM.")
-    reminder_time = input("Enter your reminder time (e.g., 3 PM or 08:30 AM): ").strip()
+    speak_in_background(REMINDER_PROMPT)
+    reminder_time = ask("Enter your reminder time (e.g., 3 PM or 08:30 AM): ").strip()
     print(f"✅ Reminder time set to: {reminder_time}")
 
-    save_new_face_image(frame, name)
+    image, filename = save_new_face_image(frame, name, get_latest_frame)
 
     print("Stage 4: Saving role and updating face database...")
-    USER_ROLES[name] = role
-    save_roles(USER_ROLES)
-    register_known_faces("known_faces")
-    print(f"Stage 5: {name} registered as {role}. System updated.")
+    # Role goes in first, so the moment the face is recognizable its role is known
+    directory.set_role(name, role)
+    for elderly in looks_after:
+        directory.link(name, elderly)
+    if image is not None and enroll_face(name, image, filename):
+        print(f"Stage 5: {name} registered as {role}. System updated.")
+    else:
+        print(f"Stage 5: {name} saved as {role}, but no face was found in the picture.")
 
     # ✅ Say goodbye with reminder
     reminder_message = f"Thank you {name.capitalize()}. I will remind you to take your medication at {reminder_time}."
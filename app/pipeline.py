@@ -0,0 +1,189 @@
+from app import clock
+from app.gesture_responder import overlay_centered_animation
+from app.gesture_recognition import detect_custom_gesture
+from app.subtitle_manager import get_current_subtitle
+from app.screen_camera_and_subtitles import add_user_preview, add_subtitles
+from app.hi_wave_detector import detect_wave
+from app.landmark_service import landmarks
+from app.compositor import compositor, display_size
+from app.text_layer_cache import draw_text
+from app.stage_timer import timings
+from app.metrics import metrics
+
+from app.interaction_flow import (
+    check_for_registration_trigger,
+    check_wave_and_start_registration,
+    start_interaction_if_wave,
+    draw_interaction_status
+)
+
+from app.config import (
+    FONT, FONT_SIZE_LARGE, FONT_THICKNESS,
+    COLOR_YELLOW,
+    IDLE_ANIMATION_NAME,
+    GESTURE_DISPLAY_DURATION, GESTURE_START_DELAY,
+    RECOGNITION_TIMEOUT
+)
+
+class AppState:
+    def __init__(self, registration_enabled=True):
+        self.show_typing_prompt = False
+        self.registration_in_progress = False
+        self.registration_enabled = registration_enabled
+        self.awaiting_wave = False
+        self.camera = None
+        self.idle_start_time = clock.now()
+
+    def get_latest_frame(self):
+        """
+        Private copy of the newest camera frame, for use off the UI thread.
+        """
+        return self.camera.snapshot() if self.camera else None
+
+class InteractionPipeline:
+    """
+    One step of the app per camera frame: recognition, wave and gesture logic,
+    and the composed display frame. All timing comes from app.clock, so the same
+    pipeline runs live (wall clock) or on a replayed video (simulated clock).
+
+    After each process() call, events lists what was decided on that frame
+    ("registration", "greeting", "gesture:<name>", "goodbye"), and goodbye is set
+    once a goodbye wave was held long enough.
+    """
+
+    REQUIRED_WAVE_DURATION = 1.8
+    STABLE_GESTURE_FRAMES = 3
+    MIN_TIME_BETWEEN_GESTURES = 2
+
+    def __init__(self, recognizer, state):
+        self.recognizer = recognizer
+        self.state = state
+
+        self.frame_count = 0
+        self.faces = []
+        self.events = []
+        self.goodbye = False
+
+        self.interaction_started = False
+        self.interaction_start_time = None
+        self.unrecognized_start_time = None
+
+        self.last_gesture = None
+        self.gesture_last_time = 0
+
+        self.wave_start_time = None
+
+        self.stable_gesture_buffer = []
+        self.gesture_cooldown_until = 0
+
+    def process(self, frame):
+        """
+        Run the pipeline on one mirrored camera frame and return the frame to display.
+        The display frame is a reused buffer, valid until the next call.
+        """
+        state = self.state
+        self.frame_count += 1
+        self.events = []
+        current_time = clock.now()
+        full_frame = frame  # Nothing draws on the camera frame
+        landmarks.new_frame(frame)
+
+        # Recognition runs on its own thread (live); use whatever result is newest
+        with timings.stage("recognition.submit"):
+            self.recognizer.submit(frame, current_time)
+        faces = self.faces = self.recognizer.latest().faces
+
+        recognized = any(face["recognized"] for face in faces)
+        has_unrecognized_face = any(not face["recognized"] for face in faces)
+
+        self.unrecognized_start_time = check_for_registration_trigger(
+            has_unrecognized_face, recognized, state, current_time,
+            self.unrecognized_start_time, RECOGNITION_TIMEOUT
+        )
+
+        if check_wave_and_start_registration(frame, state):
+            self._event("registration")
+
+        if recognized and not self.interaction_started:
+            self.interaction_started, self.interaction_start_time = start_interaction_if_wave(
+                frame, faces, self.interaction_started, current_time
+            )
+            if self.interaction_started:
+                self._event("greeting")
+
+        # Static background comes from the cache; only dynamic layers are drawn per frame
+        with timings.stage("compose_background"):
+            black_frame = compositor.begin(display_size(frame))
+
+        if not self.interaction_started and not state.registration_in_progress and (
+            not self.last_gesture or current_time - self.gesture_last_time >= GESTURE_DISPLAY_DURATION):
+            black_frame = overlay_centered_animation(black_frame, IDLE_ANIMATION_NAME, state.idle_start_time)
+
+        black_frame = draw_interaction_status(
+            black_frame, current_time, self.interaction_start_time,
+            self.last_gesture, self.gesture_last_time, state
+        )
+
+        if self.interaction_started and current_time - self.interaction_start_time >= GESTURE_START_DELAY:
+            self._update_gestures(frame, current_time)
+
+            if self.last_gesture and current_time - self.gesture_last_time < GESTURE_DISPLAY_DURATION:
+                black_frame = overlay_centered_animation(
+                    black_frame,
+                    self.last_gesture,
+                    self.gesture_last_time,
+                    duration=GESTURE_DISPLAY_DURATION
+                )
+
+                draw_text(
+                    black_frame,
+                    f"{self.last_gesture.replace('_', ' ')} detected!",
+                    (20, 50),
+                    FONT,
+                    FONT_SIZE_LARGE,
+                    COLOR_YELLOW,
+                    FONT_THICKNESS
+                )
+
+        final_display = add_user_preview(black_frame, full_frame)
+        subtitle_text = get_current_subtitle()
+        return add_subtitles(final_display, subtitle_text)
+
+    def stats(self):
+        return {"frames": self.frame_count}
+
+    def _event(self, event):
+        self.events.append(event)
+        if event.startswith("gesture:"):
+            metrics.inc("gestures", event.split(":", 1)[1])
+        else:
+            metrics.inc("interactions", event)
+
+    def _update_gestures(self, frame, current_time):
+        gesture = detect_custom_gesture(frame)
+
+        if gesture:
+            if current_time >= self.gesture_cooldown_until:
+                self.stable_gesture_buffer.append(gesture)
+                if len(self.stable_gesture_buffer) > self.STABLE_GESTURE_FRAMES:
+                    self.stable_gesture_buffer.pop(0)
+
+                if (len(self.stable_gesture_buffer) == self.STABLE_GESTURE_FRAMES and
+                        all(g == gesture for g in self.stable_gesture_buffer)):
+                    print(f"🖐️ Detected stable gesture: {gesture}")
+                    self.last_gesture = gesture
+                    self.gesture_last_time = current_time
+                    self.gesture_cooldown_until = current_time + self.MIN_TIME_BETWEEN_GESTURES
+                    self._event(f"gesture:{gesture}")
+            else:
+                self.stable_gesture_buffer.clear()
+        else:
+            self.stable_gesture_buffer.clear()
+            if detect_wave(frame):
+                if self.wave_start_time is None:
+                    self.wave_start_time = current_time
+                elif current_time - self.wave_start_time >= self.REQUIRED_WAVE_DURATION:
+                    self.goodbye = True
+                    self._event("goodbye")
+            else:
+                self.wave_start_time = None
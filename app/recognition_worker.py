@@ -0,0 +1,170 @@
+import threading
+import time
+import numpy as np
+
+from app.face_recognition import detect_and_recognize
+
+class RecognitionResult:
+    """
+    Faces found in one frame, with the capture time of that frame and
+    the time the result was published.
+    """
+
+    __slots__ = ("faces", "frame_time", "published_time")
+
+    def __init__(self, faces, frame_time, published_time):
+        self.faces = faces
+        self.frame_time = frame_time
+        self.published_time = published_time
+
+class RecognitionWorker:
+    """
+    Runs face recognition on a background thread so the render loop never waits for it.
+
+    The render loop submits every frame; only the newest one is kept, and any frame
+    that is replaced before the worker picks it up is counted as dropped.
+    Results are read with latest(), which never blocks on inference.
+    """
+
+    def __init__(self, recognize=detect_and_recognize, scale_factor=0.3):
+        self._recognize = recognize
+        self._scale_factor = scale_factor
+
+        self._cond = threading.Condition()
+        self._pending = None        # buffer holding the newest unprocessed frame
+        self._pending_time = None
+        self._has_pending = False
+        self._spare = None          # buffer the worker hands back after processing
+        self._result = RecognitionResult([], None, None)
+        self._running = False
+        self._thread = None
+
+        self._submitted = 0
+        self._processed = 0
+        self._dropped = 0
+        self._last_inference_time = 0.0
+        self._inference_time_total = 0.0
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="RecognitionWorker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, frame, frame_time=None):
+        """
+        Offer a frame for recognition. The frame is copied into a reused buffer,
+        so the caller may keep drawing on or reusing its own array.
+        """
+        with self._cond:
+            if self._has_pending:
+                self._dropped += 1
+            if self._pending is None or self._pending.shape != frame.shape:
+                self._pending = np.empty_like(frame)
+            np.copyto(self._pending, frame)
+            self._pending_time = frame_time if frame_time is not None else time.time()
+            self._has_pending = True
+            self._submitted += 1
+            self._cond.notify()
+
+    def latest(self):
+        """
+        Return the most recent RecognitionResult without blocking.
+        """
+        return self._result
+
+    def stats(self):
+        """
+        Return counters for monitoring: frames submitted/processed/dropped,
+        the age of the current result, the duration of the last inference and
+        the total time spent in inference.
+        """
+        result = self._result
+        now = time.time()
+        return {
+            "submitted": self._submitted,
+            "processed": self._processed,
+            "dropped": self._dropped,
+            "result_age": now - result.frame_time if result.frame_time is not None else None,
+            "last_inference_time": self._last_inference_time,
+            "inference_time_total": self._inference_time_total,
+        }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._has_pending:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                # Swap buffers: take the pending frame, give back the previous one
+                frame = self._pending
+                frame_time = self._pending_time
+                self._pending = self._spare
+                self._spare = frame
+                self._has_pending = False
+
+            start = time.time()
+            try:
+                faces = self._recognize(frame, scale_factor=self._scale_factor)
+            except Exception as e:
+                print(f"[ERROR] Face recognition failed: {e}")
+                continue
+            finished = time.time()
+
+            self._last_inference_time = finished - start
+            self._inference_time_total += self._last_inference_time
+            self._processed += 1
+            self._result = RecognitionResult(faces, frame_time, finished)
+
+class InlineRecognizer:
+    """
+    Same interface as RecognitionWorker, but recognizes each frame right away on the
+    caller's thread. Used for replays, where every frame must see the result of its
+    own recognition so the run is reproducible.
+    """
+
+    def __init__(self, recognize=detect_and_recognize, scale_factor=0.3):
+        self._recognize = recognize
+        self._scale_factor = scale_factor
+        self._result = RecognitionResult([], None, None)
+        self._processed = 0
+        self._last_inference_time = 0.0
+        self._inference_time_total = 0.0
+
+    def start(self):
+        return self
+
+    def stop(self, timeout=1.0):
+        pass
+
+    def submit(self, frame, frame_time=None):
+        start = time.time()
+        faces = self._recognize(frame, scale_factor=self._scale_factor)
+        self._last_inference_time = time.time() - start
+        self._inference_time_total += self._last_inference_time
+        self._processed += 1
+        self._result = RecognitionResult(faces, frame_time, frame_time)
+
+    def latest(self):
+        return self._result
+
+    def stats(self):
+        return {
+            "submitted": self._processed,
+            "processed": self._processed,
+            "dropped": 0,
+            "result_age": 0.0,
+            "last_inference_time": self._last_inference_time,
+            "inference_time_total": self._inference_time_total,
+        }
@@ -1,30 +1,61 @@
 import os
 import json
 
-# Path to the roles JSON file
+from app.database import db, person_id
+
+# Path to the legacy roles JSON file (imported into the database once)
 ROLES_FILE = os.path.join("data", "roles.json")
 os.makedirs("data", exist_ok=True)  # Make sure folder exists
 
-# Default roles if file is missing
+# Default roles if there is nothing to load
 DEFAULT_ROLES = {
     "lucia": "Elderly user",
     "daniel": "Family member",
     "nurse_ana": "Caregiver"
 }
 
-# Load roles from JSON or initialize defaults
-def load_roles():
+def _migrate_roles_file():
+    """
+    Copy roles.json into the database the first time it runs (or seed the defaults).
+    """
+    if db.get_meta("roles_migrated"):
+        return
+
+    roles = DEFAULT_ROLES
     if os.path.exists(ROLES_FILE):
         with open(ROLES_FILE, "r") as f:
-            return json.load(f)
-    else:
-        save_roles(DEFAULT_ROLES)
-        return DEFAULT_ROLES.copy()
+            roles = json.load(f)
+        print(f"📦 Importing {len(roles)} role(s) from {ROLES_FILE}")
+    save_roles(roles)
+    db.set_meta("roles_migrated", 1)
+    db.flush()
 
-# Save roles to JSON
+# Load roles from the database
+def load_roles():
+    _migrate_roles_file()
+    rows = db.query("SELECT people.name, roles.role FROM roles JOIN people ON people.id = roles.person_id")
+    return dict(rows)
+
+# Save (insert or update) one user's role, without waiting for the disk
+def save_role(name, role):
+    def write(conn):
+        conn.execute(
+            "INSERT OR REPLACE INTO roles (person_id, role) VALUES (?, ?)",
+            (person_id(conn, name), role)
+        )
+    return db.write(write)
+
+# Save every role in the dictionary
 def save_roles(roles_dict):
-    with open(ROLES_FILE, "w") as f:
-        json.dump(roles_dict, f, indent=4)
+    items = list(roles_dict.items())
+
+    def write(conn):
+        for name, role in items:
+            conn.execute(
+                "INSERT OR REPLACE INTO roles (person_id, role) VALUES (?, ?)",
+                (person_id(conn, name), role)
+            )
+    return db.write(write)
 
 # Global dictionary used by other parts of the app
 USER_ROLES = load_roles()
@@ -0,0 +1,102 @@
+import threading
+
+from app.database import db, person_id
+from app.role_database import USER_ROLES, save_role
+from app.visit_logger import get_last_visit
+
+ELDERLY_ROLE = "Elderly user"
+CARER_ROLES = ("Family member", "Caregiver")
+
+class RoleDirectory:
+    """
+    In-memory view of who is who: name -> role, a reverse index role -> names,
+    and which elderly users each family member or caregiver looks after.
+
+    Everything is answered from memory. Changes update the indexes right away
+    and are written to the database in the background.
+    A carer without explicit care links is linked to every elderly user.
+    """
+
+    def __init__(self, roles=USER_ROLES):
+        self._roles = roles                 # shared with role_database.USER_ROLES
+        self._by_role = {}                  # role -> set of names
+        self._care_links = {}               # carer name -> set of elderly names
+        self._lock = threading.Lock()
+
+        for name, role in roles.items():
+            self._by_role.setdefault(role, set()).add(name)
+
+        rows = db.query(
+            "SELECT carer.name, elderly.name FROM care_links "
+            "JOIN people AS carer ON carer.id = care_links.person_id "
+            "JOIN people AS elderly ON elderly.id = care_links.elderly_id"
+        )
+        for carer, elderly in rows:
+            self._care_links.setdefault(carer, set()).add(elderly)
+
+    def role_of(self, name):
+        return self._roles.get(name.strip().lower(), "Unknown role")
+
+    def people_with_role(self, role):
+        with self._lock:
+            return set(self._by_role.get(role, ()))
+
+    def set_role(self, name, role):
+        name = name.strip().lower()
+        with self._lock:
+            old_role = self._roles.get(name)
+            if old_role is not None:
+                self._by_role.get(old_role, set()).discard(name)
+            self._roles[name] = role
+            self._by_role.setdefault(role, set()).add(name)
+        return save_role(name, role)
+
+    def link(self, carer, elderly):
+        """
+        Record that carer looks after elderly.
+        """
+        carer, elderly = carer.strip().lower(), elderly.strip().lower()
+        with self._lock:
+            self._care_links.setdefault(carer, set()).add(elderly)
+
+        def write(conn):
+            conn.execute(
+                "INSERT OR IGNORE INTO care_links (person_id, elderly_id) VALUES (?, ?)",
+                (person_id(conn, carer), person_id(conn, elderly))
+            )
+        return db.write(write)
+
+    def unlink(self, carer, elderly):
+        carer, elderly = carer.strip().lower(), elderly.strip().lower()
+        with self._lock:
+            self._care_links.get(carer, set()).discard(elderly)
+
+        def write(conn):
+            conn.execute(
+                "DELETE FROM care_links WHERE person_id = ? AND elderly_id = ?",
+                (person_id(conn, carer), person_id(conn, elderly))
+            )
+        return db.write(write)
+
+    def linked_elderly(self, name):
+        """
+        Elderly users this person looks after, with their last-seen time (or None),
+        most recently seen first.
+        """
+        name = name.strip().lower()
+        if self._roles.get(name) not in CARER_ROLES:
+            return []
+        with self._lock:
+            # Copy: other threads may add or remove links while we look up visits
+            linked = tuple(self._care_links.get(name) or self._by_role.get(ELDERLY_ROLE, ()))
+        people = [(elderly, get_last_visit(elderly)) for elderly in linked]
+        people.sort(key=lambda p: (p[1] is not None, p[1] or 0, p[0]), reverse=True)
+        return people
+
+# Shared directory used by the greeting and registration code
+directory = RoleDirectory()
+
+# Optional test
+if __name__ == "__main__":
+    for person in ["daniel", "nurse_ana", "lucia"]:
+        print(f"{person} ({directory.role_of(person)}) → {directory.linked_elderly(person)}")
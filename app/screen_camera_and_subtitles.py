@@ -1,19 +1,28 @@
 import cv2
 import textwrap
+from functools import lru_cache
+
+from app.text_layer_cache import draw_text
+from app.frame_pool import frame_pool
+from app.stage_timer import timings
 from app.config import (
     FONT, FONT_SIZE_SMALL, FONT_THICKNESS,
     COLOR_WHITE
 )
 
+@lru_cache(maxsize=64)
+def _wrap_subtitle(text, max_line_width):
+    return tuple(textwrap.wrap(text, width=max_line_width))
+
+@timings.timed("add_user_preview")
 def add_user_preview(frame, full_frame, width_ratio=0.2, height_ratio=0.3, padding=10):
     """
-    Adds a small preview of the user's camera feed to the bottom-right corner.
+    Adds a small preview of the user's camera feed to the bottom-right corner, in place.
     """
-    user_view_small = cv2.resize(
-        full_frame,
-        (int(full_frame.shape[1] * width_ratio), int(full_frame.shape[0] * height_ratio)),
-        interpolation=cv2.INTER_AREA
-    )
+    preview_w = int(full_frame.shape[1] * width_ratio)
+    preview_h = int(full_frame.shape[0] * height_ratio)
+    user_view_small = frame_pool.get("user_preview", (preview_h, preview_w, full_frame.shape[2]))
+    cv2.resize(full_frame, (preview_w, preview_h), dst=user_view_small, interpolation=cv2.INTER_AREA)
 
     y_offset = frame.shape[0] - user_view_small.shape[0] - padding
     x_offset = frame.shape[1] - user_view_small.shape[1] - padding
@@ -24,6 +33,7 @@ def add_user_preview(frame, full_frame, width_ratio=0.2, height_ratio=0.3, paddi
     return frame
 
 
+@timings.timed("add_subtitles")
 def add_subtitles(frame, text, max_line_width=45, line_height=25, padding=10):
     """
     Adds wrapped subtitle text to the bottom of the frame with bold outline, no background.
@@ -31,18 +41,15 @@ def add_subtitles(frame, text, max_line_width=45, line_height=25, padding=10):
     if not text:
         return frame
 
-    wrapped_lines = textwrap.wrap(text, width=max_line_width)
+    wrapped_lines = _wrap_subtitle(text, max_line_width)
     subtitle_y = frame.shape[0] - line_height * len(wrapped_lines) - padding
 
     for i, line in enumerate(wrapped_lines):
         y = subtitle_y + i * line_height
 
-        # Step 1: Draw black outline (shadow)
-        cv2.putText(frame, line, (20, y),
-                    FONT, FONT_SIZE_SMALL, (0, 0, 0), FONT_THICKNESS + 2)
-
-        # Step 2: Draw white text on top
-        cv2.putText(frame, line, (20, y),
-                    FONT, FONT_SIZE_SMALL, COLOR_WHITE, FONT_THICKNESS)
+        # White text with a black outline, rasterized once per line and reused
+        draw_text(frame, line, (20, y),
+                  FONT, FONT_SIZE_SMALL, COLOR_WHITE, FONT_THICKNESS,
+                  outline_thickness=FONT_THICKNESS + 2)
 
     return frame
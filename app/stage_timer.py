@@ -0,0 +1,201 @@
+import bisect
+import functools
+import json
+import threading
+import time
+
+from app.config import STAGE_TIMING, STAGE_TIMING_INTERVAL
+
+# Bucket upper edges in seconds: 10 µs to ~100 s, 8 buckets per factor of 10 (~33% wide)
+BUCKET_EDGES = [1e-5 * 10 ** (i / 8) for i in range(57)]
+
+class LatencyHistogram:
+    """
+    Fixed-size latency histogram (one counter per bucket, whatever the number of samples).
+    Percentiles are read from the buckets, so they are accurate to one bucket width.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES) + 1)  # last bucket: anything slower
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_EDGES, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        if self.count == 0:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKET_EDGES[i], self.max) if i < len(BUCKET_EDGES) else self.max
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def summary(self):
+        ms = lambda s: round(1000 * s, 3) if s is not None else None
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max),
+        }
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class StageTimer:
+    """
+    Per-stage latency histograms for the frame pipeline.
+
+    Each stage has two histograms: one since start, and a rolling one for the
+    current reporting window, whose p50/p95/p99 are printed every interval
+    seconds (see maybe_report) and then reset. When disabled, stage() returns a
+    shared no-op context and timed() functions only check one flag.
+    """
+
+    def __init__(self, enabled=STAGE_TIMING, interval=STAGE_TIMING_INTERVAL):
+        self.enabled = enabled
+        self.interval = interval
+        self._total = {}
+        self._window = {}
+        self._lock = threading.Lock()
+        self._window_start = time.perf_counter()
+
+    def stage(self, name):
+        """
+        Context manager timing one stage: with timings.stage("display"): ...
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def timed(self, name):
+        """
+        Decorator timing every call of a function as a stage.
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        with self._lock:
+            total = self._total.get(name)
+            if total is None:
+                total = self._total[name] = LatencyHistogram()
+                self._window[name] = LatencyHistogram()
+            total.record(seconds)
+            self._window[name].record(seconds)
+
+    def summary(self, window=False):
+        histograms = self._window if window else self._total
+        with self._lock:
+            return {name: h.summary() for name, h in sorted(histograms.items())}
+
+    def maybe_report(self):
+        """
+        Print the rolling window's summary once per interval. Cheap to call every frame.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if now - self._window_start < self.interval:
+            return
+        elapsed = now - self._window_start
+        self._window_start = now
+        self.print_summary(window=True, elapsed=elapsed)
+        with self._lock:
+            for h in self._window.values():
+                h.reset()
+
+    def print_summary(self, window=False, elapsed=None):
+        title = f"last {elapsed:.0f}s" if window and elapsed else "since start"
+        print(f"⏱️ Stage timings ({title}):")
+        print(f"   {'stage':<24}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, s in self.summary(window).items():
+            if s["count"]:
+                print(f"   {name:<24}{s['count']:>8}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}"
+                      f"{s['p99_ms']:>10.2f}{s['max_ms']:>10.2f}")
+
+    def dump(self, path):
+        """
+        Write the since-start summary as JSON.
+        """
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=4)
+
+# Shared timer for the whole app (enable with config.STAGE_TIMING or --timings)
+timings = StageTimer()
+
+# Overhead check: cost of a stage when disabled and enabled
+if __name__ == "__main__":
+    n = 200_000
+    timer = StageTimer(enabled=False)
+
+    @timer.timed("noop")
+    def noop():
+        pass
+
+    for enabled in (False, True):
+        timer.enabled = enabled
+        start = time.perf_counter()
+        for _ in range(n):
+            with timer.stage("noop"):
+                pass
+        with_stage = (time.perf_counter() - start) / n
+        start = time.perf_counter()
+        for _ in range(n):
+            noop()
+        with_decorator = (time.perf_counter() - start) / n
+        print(f"{'Enabled ' if enabled else 'Disabled'}: stage() {with_stage * 1e6:.2f} µs, "
+              f"timed() {with_decorator * 1e6:.2f} µs per call")
+    timer.print_summary()
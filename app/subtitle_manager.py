@@ -1,4 +1,4 @@
-import time
+from app import clock
 
 # Global variables for tracking subtitle state
 current_subtitle = ""
@@ -11,13 +11,13 @@ def update_subtitle(text):
     """
     global current_subtitle, last_update_time
     current_subtitle = text
-    last_update_time = time.time()
+    last_update_time = clock.now()
 
 def get_current_subtitle():
     """
     Return the current subtitle if it's still within the display duration.
     Otherwise, return an empty string.
     """
-    if time.time() - last_update_time < subtitle_display_duration:
+    if clock.now() - last_update_time < subtitle_display_duration:
         return current_subtitle
     return ""
@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+from collections import OrderedDict
+
+class TextPatch:
+    """
+    A label rasterized once: BGR pixels, a coverage mask, and the offset of the
+    patch's top-left corner relative to the cv2.putText origin (bottom-left of the text).
+    """
+
+    __slots__ = ("color", "mask", "dx", "dy")
+
+    def __init__(self, color, mask, dx, dy):
+        self.color = color
+        self.mask = mask
+        self.dx = dx
+        self.dy = dy
+
+class TextLayerCache:
+    """
+    LRU cache of rasterized text keyed by string, font, size, color and thickness.
+    A label is drawn with cv2.putText once; after that it is blitted with a masked copy.
+    The least recently used patches are evicted once max_entries is reached, so
+    changing subtitles do not grow memory without bound.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._patches = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._patches)
+
+    def get(self, text, font, scale, color, thickness, outline_thickness=None, outline_color=(0, 0, 0)):
+        key = (text, font, scale, tuple(color), thickness, outline_thickness, tuple(outline_color))
+        patch = self._patches.get(key)
+        if patch is not None:
+            self._patches.move_to_end(key)
+            self.hits += 1
+            return patch
+
+        self.misses += 1
+        patch = _rasterize(text, font, scale, color, thickness, outline_thickness, outline_color)
+        self._patches[key] = patch
+        if len(self._patches) > self.max_entries:
+            self._patches.popitem(last=False)
+        return patch
+
+    def draw(self, frame, text, org, font, scale, color, thickness, outline_thickness=None, outline_color=(0, 0, 0)):
+        """
+        Same result as cv2.putText (optionally preceded by an outline pass), in place.
+        """
+        if not text:
+            return frame
+        patch = self.get(text, font, scale, color, thickness, outline_thickness, outline_color)
+        _blit(frame, patch, org[0] + patch.dx, org[1] + patch.dy)
+        return frame
+
+def _rasterize(text, font, scale, color, thickness, outline_thickness, outline_color):
+    widest = max(thickness, outline_thickness or 0)
+    (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, widest)
+    pad = widest + 2
+
+    h = text_h + baseline + 2 * pad
+    w = text_w + 2 * pad
+    origin = (pad, pad + text_h)
+
+    color_patch = np.zeros((h, w, 3), dtype=np.uint8)
+    mask = np.zeros((h, w), dtype=np.uint8)
+    if outline_thickness:
+        cv2.putText(color_patch, text, origin, font, scale, outline_color, outline_thickness)
+        cv2.putText(mask, text, origin, font, scale, 255, outline_thickness)
+    cv2.putText(color_patch, text, origin, font, scale, color, thickness)
+    cv2.putText(mask, text, origin, font, scale, 255, thickness)
+
+    return TextPatch(color_patch, (mask > 0)[:, :, None], -origin[0], -origin[1])
+
+def _blit(frame, patch, x, y):
+    # Clip the patch to the frame
+    h, w = patch.mask.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    px, py = x0 - x, y0 - y
+    np.copyto(
+        frame[y0:y1, x0:x1],
+        patch.color[py:py + y1 - y0, px:px + x1 - x0],
+        where=patch.mask[py:py + y1 - y0, px:px + x1 - x0]
+    )
+
+# Shared cache for the UI thread
+text_cache = TextLayerCache()
+
+def draw_text(frame, text, org, font, scale, color, thickness, outline_thickness=None):
+    """
+    Drop-in for cv2.putText that reuses the rasterized label across frames.
+    """
+    return text_cache.draw(frame, text, org, font, scale, color, thickness, outline_thickness)
@@ -1,31 +1,365 @@
-import pyttsx3
+import os
+import json
+import wave
+import hashlib
+import itertools
+import queue
+import threading
 import time  # ✅ Added for subtitle timing
+from concurrent.futures import Future
+
 from app.subtitle_manager import update_subtitle  # ✅ For showing subtitles
+from app.metrics import metrics
+from app.config import TTS_ENGINE, TTS_VOICE_HINT, TTS_RATE, TTS_VOLUME, TTS_CACHE_FOLDER, FIXED_PROMPTS
+
+# Optional audio players for cached phrases
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+# Lower numbers are spoken first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+SUBTITLE_LEAD = 0.1  # ✅ Allow UI thread time to catch subtitle before the audio starts
+
+class SpeechEngine:
+    """
+    Interface for speech back-ends. speak() blocks until the text has been spoken.
+    Engines are created and used on the speech worker thread only.
+    """
+
+    def speak(self, text):
+        raise NotImplementedError
+
+    def idle(self):
+        """
+        Do a bit of optional work while nothing is queued (e.g. fill a cache).
+        Returns True if there is more to do.
+        """
+        return False
+
+def phrase_key(text, voice, rate, volume):
+    """
+    Content address of a rendered phrase.
+    """
+    key = json.dumps([text, voice, rate, volume])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+class WavPlayer:
+    """
+    Plays WAV files with winsound (Windows) or PyAudio. available is False when neither is installed.
+    """
+
+    def __init__(self):
+        self._pyaudio = None
+        self.available = winsound is not None or pyaudio is not None
+
+    def play(self, path):
+        if winsound is not None:
+            # SND_NODEFAULT: never fall back to the system beep
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_NODEFAULT)
+            return True
+        if pyaudio is None:
+            return False
+
+        if self._pyaudio is None:
+            self._pyaudio = pyaudio.PyAudio()
+        try:
+            wav = wave.open(path, "rb")
+        except (wave.Error, EOFError, OSError):
+            return False  # e.g. a platform voice that renders AIFF, or a missing file
+        with wav:
+            stream = self._pyaudio.open(
+                format=self._pyaudio.get_format_from_width(wav.getsampwidth()),
+                channels=wav.getnchannels(),
+                rate=wav.getframerate(),
+                output=True
+            )
+            try:
+                data = wav.readframes(4096)
+                while data:
+                    stream.write(data)
+                    data = wav.readframes(4096)
+            finally:
+                stream.stop_stream()
+                stream.close()
+        return True
+
+class Pyttsx3Engine(SpeechEngine):
+    """
+    Offline speech with pyttsx3, with an on-disk cache of rendered phrases.
+
+    The fixed prompts are rendered to WAV files while the worker is idle (or right
+    after they are first spoken live); any other phrase is rendered just after it
+    is spoken live for the second time. Cached phrases are played from the file.
+    Files are named by a hash of text, voice, rate and volume, so changing a setting
+    never plays stale audio. One-off sentences (names, times) are never cached.
+    """
+
+    def __init__(self, voice_hint=TTS_VOICE_HINT, rate=TTS_RATE, volume=TTS_VOLUME,
+                 cache_folder=TTS_CACHE_FOLDER, prerender=FIXED_PROMPTS):
+        import pyttsx3
+
+        self._engine = pyttsx3.init()
+
+        # Select the preferred voice
+        for voice in self._engine.getProperty('voices'):
+            if voice_hint in voice.id.lower():
+                self._engine.setProperty('voice', voice.id)
+                break
+
+        # Set standard speech properties
+        self._engine.setProperty('rate', rate)      # Speed
+        self._engine.setProperty('volume', volume)  # Max volume
+
+        self.voice = self._engine.getProperty('voice')
+        self.rate = rate
+        self.volume = volume
+        self.cache_folder = cache_folder
+        self.player = WavPlayer()
+        self._seen = set()  # cache paths of phrases spoken once, cached if they come back
+        self.cache_hits = 0
+        os.makedirs(cache_folder, exist_ok=True)
+
+        # Fixed prompts still missing from the cache
+        self._unrendered = [
+            text for text in prerender if not os.path.exists(self.cache_path(text))
+        ] if self.player.available else []
+
+    def cache_path(self, text):
+        return os.path.join(self.cache_folder, phrase_key(text, self.voice, self.rate, self.volume) + ".wav")
 
-# Initialize the text-to-speech engine once
-_engine = pyttsx3.init()
+    def render(self, text):
+        """
+        Render text to its cache file (if not there yet) and return the path.
+        """
+        path = self.cache_path(text)
+        if not os.path.exists(path):
+            tmp_path = path + ".tmp.wav"
+            self._engine.save_to_file(text, tmp_path)
+            self._engine.runAndWait()
+            if os.path.exists(tmp_path) and os.path.getsize(tmp_path) > 0:
+                os.replace(tmp_path, path)
+        return path
 
-# Select the preferred voice (Microsoft Zira - US English Female)
-for voice in _engine.getProperty('voices'):
-    if "david" in voice.id.lower():
-        _engine.setProperty('voice', voice.id)
-        break
+    def idle(self):
+        if not self._unrendered:
+            return False
+        self.render(self._unrendered.pop(0))
+        return bool(self._unrendered)
 
-# Set standard speech properties
-_engine.setProperty('rate', 150)    # Speed
-_engine.setProperty('volume', 1.0)  # Max volume
+    def speak(self, text):
+        path = self.cache_path(text)
+        if self.player.available and os.path.exists(path) and self.player.play(path):
+            self.cache_hits += 1
+            return
+
+        self._engine.say(text)
+        self._engine.runAndWait()
+
+        # Render after speaking, so caching never delays the words themselves
+        if not self.player.available:
+            return
+        if text in self._unrendered or path in self._seen:
+            self.render(text)
+            if text in self._unrendered:
+                self._unrendered.remove(text)
+        else:
+            self._seen.add(path)
+
+class SilentEngine(SpeechEngine):
+    """
+    Makes no sound. Optionally takes as long as speaking would (words_per_minute),
+    so timing of the rest of the app can be tested headless.
+    """
+
+    def __init__(self, words_per_minute=None):
+        self.words_per_minute = words_per_minute
+        self.spoken = []
+
+    def speak(self, text):
+        self.spoken.append(text)
+        if self.words_per_minute:
+            time.sleep(60.0 * len(text.split()) / self.words_per_minute)
+
+ENGINES = {
+    "pyttsx3": Pyttsx3Engine,
+    "silent": SilentEngine,
+}
+
+class Utterance:
+    __slots__ = ("text", "priority", "future", "on_start", "on_done", "pause_after", "queued_time")
+
+    def __init__(self, text, priority, on_start, on_done, pause_after):
+        self.text = text
+        self.priority = priority
+        self.future = Future()
+        self.on_start = on_start
+        self.on_done = on_done
+        self.pause_after = pause_after
+        self.queued_time = time.time()
+
+class SpeechWorker:
+    """
+    One thread that owns the speech engine and speaks queued utterances one at
+    a time, highest priority first (FIFO within a priority).
+
+    speak_async() returns a Future that completes when the utterance has been
+    spoken; cancelling the Future before it starts removes it from the queue.
+    The subtitle is updated at the moment an utterance actually starts.
+    """
+
+    def __init__(self, engine_factory=None):
+        self.engine_factory = engine_factory or ENGINES[TTS_ENGINE]
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.spoken = 0
+        self.cancelled = 0
+        self._wait_sum = 0.0
+        self._speak_sum = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SpeechWorker", daemon=True)
+                self._thread.start()
+        return self
+
+    def speak_async(self, text, priority=PRIORITY_NORMAL, on_start=None, on_done=None, pause_after=0.0):
+        """
+        Queue text to be spoken. on_start(text) runs when speech starts and
+        on_done(future) when it ends. Returns a Future.
+        """
+        self.start()
+        utterance = Utterance(text, priority, on_start, on_done, pause_after)
+        if on_done is not None:
+            utterance.future.add_done_callback(on_done)
+        with self._lock:
+            self._pending.add(utterance)
+        # A cancelled utterance stops counting as pending right away, not when the worker reaches it
+        utterance.future.add_done_callback(lambda _: self._forget(utterance))
+        self._queue.put((priority, next(self._seq), utterance))
+        return utterance.future
+
+    def _forget(self, utterance):
+        with self._lock:
+            self._pending.discard(utterance)
+
+    def cancel_pending(self, min_priority=PRIORITY_HIGH):
+        """
+        Cancel every queued utterance with priority >= min_priority
+        (the one being spoken is allowed to finish). Returns the number cancelled.
+        """
+        with self._lock:
+            pending = [u for u in self._pending if u.priority >= min_priority]
+        return sum(u.future.cancel() for u in pending)
+
+    def stats(self):
+        done = self.spoken or 1
+        return {
+            "queued": len(self._pending),  # the queue itself still holds cancelled utterances
+            "spoken": self.spoken,
+            "cancelled": self.cancelled,
+            "avg_wait_ms": 1000 * self._wait_sum / done,
+            "avg_speak_ms": 1000 * self._speak_sum / done,
+        }
+
+    def _create_engine(self):
+        """
+        Build the configured engine, or fall back to a silent one so queued
+        utterances still complete (e.g. pyttsx3 or a system voice is missing).
+        """
+        try:
+            return self.engine_factory()
+        except Exception as e:
+            print(f"[ERROR] Could not start the speech engine, continuing without audio: {e}")
+            return SilentEngine()
+
+    def _run(self):
+        engine = self._create_engine()
+        while True:
+            try:
+                _, _, utterance = self._queue.get_nowait()
+            except queue.Empty:
+                # Nothing to say: let the engine prepare, one small step at a time
+                try:
+                    if engine.idle():
+                        continue
+                except Exception as e:
+                    print(f"[ERROR] Speech engine background work failed: {e}")
+                _, _, utterance = self._queue.get()
+            with self._lock:
+                self._pending.discard(utterance)
+            if not utterance.future.set_running_or_notify_cancel():
+                self.cancelled += 1
+                continue
+
+            start = time.time()
+            self._wait_sum += start - utterance.queued_time
+            try:
+                update_subtitle(utterance.text)
+                if utterance.on_start is not None:
+                    utterance.on_start(utterance.text)
+                time.sleep(SUBTITLE_LEAD)
+                engine.speak(utterance.text)
+            except Exception as e:
+                print(f"[ERROR] Speech failed: {e}")
+                utterance.future.set_exception(e)
+            else:
+                utterance.future.set_result(utterance.text)
+            self.spoken += 1
+            self._speak_sum += time.time() - start
+
+            if utterance.pause_after:
+                time.sleep(utterance.pause_after)
+
+# Shared speech worker (started on first use)
+speech = SpeechWorker()
+metrics.add_source("speech", speech.stats)
+
+def speak_async(text, priority=PRIORITY_NORMAL, on_start=None, on_done=None, pause_after=0.0):
+    return speech.speak_async(text, priority, on_start, on_done, pause_after)
 
 def speak_text(text: str) -> None:
     """
-    Speak the given text out loud using the TTS engine,
-    and show the text as a subtitle.
+    Speak the given text out loud and show it as a subtitle.
+    Blocks until it has been spoken.
     """
-    update_subtitle(text)   # ✅ Set subtitle first
-    time.sleep(0.1)         # ✅ Allow UI thread time to catch subtitle
-    _engine.say(text)
-    _engine.runAndWait()
+    speak_async(text).result()
 
 # Optional test when running this file directly
 if __name__ == "__main__":
-    print("🔊 Speaking with Microsoft Zira...")
-    speak_text("Hello! This is a test of the offline text to speech system.")
+    import sys
+
+    if "--prerender" in sys.argv:
+        # Install step: render the fixed prompts into the phrase cache
+        from app.config import FIXED_PROMPTS
+
+        engine = Pyttsx3Engine()
+        for prompt in FIXED_PROMPTS:
+            print(f"🎙️ {engine.render(prompt)}  {prompt}")
+        print(f"✅ {len(FIXED_PROMPTS)} prompt(s) rendered to {engine.cache_folder}")
+    elif "--silent" in sys.argv:
+        # Headless throughput/latency check with the silent engine
+        worker = SpeechWorker(engine_factory=lambda: SilentEngine(words_per_minute=6000))
+        futures = [worker.speak_async(f"Test sentence number {i}.") for i in range(200)]
+        futures[-1].cancel()
+        urgent = worker.speak_async("Urgent.", priority=PRIORITY_HIGH)
+        for future in futures[:-1] + [urgent]:
+            future.result()
+        print(f"📊 Speech worker: {worker.stats()}")
+    else:
+        print("🔊 Speaking with the configured voice...")
+        speak_text("Hello! This is a test of the offline text to speech system.")
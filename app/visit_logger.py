@@ -1,54 +1,154 @@
 import os
 import json
+import threading
+from collections import Counter
 from datetime import datetime
 
+from app import clock
+from app.database import db, person_id
+
 LOG_FOLDER = "data"
-LOG_FILE = os.path.join(LOG_FOLDER, "user_visits.json")
+LOG_FILE = os.path.join(LOG_FOLDER, "user_visits.json")          # Legacy whole-file log
+VISIT_LOG_FILE = os.path.join(LOG_FOLDER, "user_visits.log")     # Legacy append-only log
 
 os.makedirs(LOG_FOLDER, exist_ok=True)
 
+# In-memory index, rebuilt from the database at startup
+_last_visit = {}        # name -> datetime of the most recent visit
+_visits_per_day = {}    # name -> Counter(date -> number of visits)
+_lock = threading.Lock()
+
 def load_visit_log():
+    """
+    Read the legacy JSON log (name -> list of ISO timestamps).
+    """
     if os.path.exists(LOG_FILE):
         with open(LOG_FILE, "r") as f:
             return json.load(f)
     return {}
 
-def save_visit_log(log_data):
-    with open(LOG_FILE, "w") as f:
-        json.dump(log_data, f, indent=4)
+def _add_visit(name, visit_time, count=1):
+    _visits_per_day.setdefault(name, Counter())[visit_time.date()] += count
+    if name not in _last_visit or visit_time > _last_visit[name]:
+        _last_visit[name] = visit_time
+
+def _apply_record(record):
+    """
+    Replay one line of the legacy append-only log. Records are either a single
+    visit {"name", "time"}, or compacted ones: {"name", "day", "count"} and {"name", "last"}.
+    """
+    name = record["name"]
+    if "time" in record:
+        _add_visit(name, datetime.fromisoformat(record["time"]))
+    elif "day" in record:
+        day = datetime.fromisoformat(record["day"]).date()
+        _visits_per_day.setdefault(name, Counter())[day] += record["count"]
+    elif "last" in record:
+        last = datetime.fromisoformat(record["last"])
+        if name not in _last_visit or last > _last_visit[name]:
+            _last_visit[name] = last
+
+def _read_legacy_logs():
+    if os.path.exists(VISIT_LOG_FILE):
+        with open(VISIT_LOG_FILE, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    _apply_record(json.loads(line))
+                except (ValueError, KeyError):
+                    continue  # e.g. a half-written last line after a crash
+        return
+
+    for name, visits in load_visit_log().items():
+        for visit_time in visits:
+            try:
+                _add_visit(name, datetime.fromisoformat(visit_time))
+            except ValueError:
+                continue
+
+def _migrate_legacy_logs():
+    """
+    Import the old visit logs into the database once. Compacted days only kept a
+    count, so those visits are stored at midnight, except the user's last visit.
+    """
+    if db.get_meta("visits_migrated"):
+        return
+
+    _read_legacy_logs()
+    rows = []
+    for name, days in _visits_per_day.items():
+        last = _last_visit.get(name)
+        for day, count in days.items():
+            times = [datetime.combine(day, datetime.min.time())] * count
+            if last is not None and last.date() == day:
+                times[-1] = last
+            rows.extend((name, day.isoformat(), t.isoformat()) for t in times)
+
+    def write(conn):
+        ids = {}
+        for name, day, visited_at in rows:
+            if name not in ids:
+                ids[name] = person_id(conn, name)
+        conn.executemany(
+            "INSERT INTO visits (person_id, day, visited_at) VALUES (?, ?, ?)",
+            ((ids[name], day, visited_at) for name, day, visited_at in rows)
+        )
+
+    if rows:
+        print(f"📦 Importing {len(rows)} visit(s) from the old visit log")
+        db.write(write)
+    db.set_meta("visits_migrated", 1)
+    db.flush()
+    _visits_per_day.clear()
+    _last_visit.clear()
+
+def _load_index():
+    """
+    Rebuild the index from per-day aggregates (served by the (person, day) index).
+    """
+    _migrate_legacy_logs()
+    rows = db.query(
+        "SELECT people.name, visits.day, COUNT(*), MAX(visits.visited_at) "
+        "FROM visits JOIN people ON people.id = visits.person_id "
+        "GROUP BY visits.person_id, visits.day"
+    )
+    for name, day, count, last in rows:
+        _visits_per_day.setdefault(name, Counter())[datetime.fromisoformat(day).date()] = count
+        last = datetime.fromisoformat(last)
+        if name not in _last_visit or last > _last_visit[name]:
+            _last_visit[name] = last
 
 def log_user_visit(name):
+    """
+    Record a visit: an O(1) index update plus one queued insert (never waits for the disk).
+    """
     name = name.lower()
-    log_data = load_visit_log()
-    timestamp = datetime.now().isoformat()
-    if name not in log_data:
-        log_data[name] = []
-    log_data[name].append(timestamp)
-    save_visit_log(log_data)
+    now = datetime.fromtimestamp(clock.now())
+
+    with _lock:
+        _add_visit(name, now)
+
+    def write(conn):
+        conn.execute(
+            "INSERT INTO visits (person_id, day, visited_at) VALUES (?, ?, ?)",
+            (person_id(conn, name), now.date().isoformat(), now.isoformat())
+        )
+    db.write(write)
 
 def user_visited_today(name):
     name = name.lower()
-    log_data = load_visit_log()
-    if name not in log_data:
-        return False
-
-    today = datetime.now().date()
-    for visit_time in log_data[name]:
-        try:
-            visit_date = datetime.fromisoformat(visit_time).date()
-            if visit_date == today:
-                return True
-        except Exception:
-            continue
-    return False
+    today = datetime.fromtimestamp(clock.now()).date()
+    return _visits_per_day.get(name, {}).get(today, 0) > 0
+
+def get_visits_on(name, day):
+    """
+    Number of visits of a user on a given date.
+    """
+    return _visits_per_day.get(name.lower(), {}).get(day, 0)
 
 def get_last_visit(name):
-    name = name.lower()
-    log_data = load_visit_log()
-    if name in log_data and log_data[name]:
-        try:
-            last_time = datetime.fromisoformat(log_data[name][-1])
-            return last_time
-        except Exception:
-            pass
-    return None
+    return _last_visit.get(name.lower())
+
+_load_index()
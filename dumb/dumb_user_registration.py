@@ -1,33 +1,25 @@
 # dumb_user_registration.py
 
 import time
-import threading
 from datetime import datetime
 import cv2
-from app.text_to_speech import speak_text
-from app.subtitle_manager import update_subtitle
+from app.text_to_speech import speak_async
 from app.gesture_responder import overlay_centered_animation
-from app.config import RAW_BACKGROUND
+from app.compositor import compositor, display_size
 from app.screen_camera_and_subtitles import add_subtitles
 
 def play_animation_during_speech(messages, cap, window_name, window_width, window_height):
     for msg in messages:
-        update_subtitle(msg)
         start_time = time.time()
+        speaking = speak_async(msg)
 
-        def speak():
-            speak_text(msg)
-
-        tts_thread = threading.Thread(target=speak)
-        tts_thread.start()
-
-        while tts_thread.is_alive():
+        while not speaking.done():
             ret, frame = cap.read()
             if not ret:
                 break
             frame = cv2.flip(frame, 1)
-            background_frame = cv2.resize(RAW_BACKGROUND, (int(frame.shape[1] * 0.8), frame.shape[0]))
-            animated_frame = overlay_centered_animation(background_frame.copy(), "Speaking", start_time, duration=3)
+            background_frame = compositor.begin(display_size(frame))
+            animated_frame = overlay_centered_animation(background_frame, "Speaking", start_time, duration=3)
             frame_with_text = add_subtitles(animated_frame, msg)
             cv2.imshow(window_name, frame_with_text)
             if cv2.waitKey(1) & 0xFF == ord('q'):
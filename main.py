@@ -1,193 +1,118 @@
 # main.py
+#
+#   python main.py                                   # webcam + window (normal use)
+#   python main.py --headless                        # no window, no keyboard
+#   python main.py --headless --sink file --output run.mp4 --answers answers.json
 
-import cv2
+import argparse
 import time
-import threading
-import numpy as np
-import os
-import sys
-import subprocess
-
-from app.face_recognition import detect_and_recognize, register_known_faces
-from app.gesture_recognition import detect_custom_gesture
-from app.gesture_responder import overlay_centered_animation
-from app.role_database import USER_ROLES
-from app.subtitle_manager import get_current_subtitle
-from app.screen_camera_and_subtitles import add_user_preview, add_subtitles
-from app.text_to_speech import speak_text
-from app.hi_wave_detector import detect_wave
-
-from app.interaction_flow import (
-    check_for_registration_trigger,
-    check_wave_and_start_registration,
-    start_interaction_if_wave,
-    draw_interaction_status,
-    run_registration_flow,
-    handle_goodbye_wave
-)
-
-from app.config import (
-    FONT, FONT_SIZE_MEDIUM, FONT_SIZE_LARGE, FONT_THICKNESS,
-    COLOR_PINK, COLOR_YELLOW,
-    WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_NAME,
-    IDLE_ANIMATION_NAME,
-    GESTURE_DISPLAY_DURATION, GESTURE_START_DELAY,
-    SHOW_WAVE_MESSAGE_DURATION, RECOGNITION_TIMEOUT,
-    RAW_BACKGROUND
-)
-
-def speak_in_background(message: str):
-    thread = threading.Thread(target=speak_text, args=(message,))
-    thread.start()
-
-class AppState:
-    def __init__(self):
-        self.show_typing_prompt = False
-        self.registration_in_progress = False
-        self.awaiting_wave = False
-        self.request_restart = False
-        self.idle_start_time = time.time()
-
-def main():
-    while True:
-        state = AppState()
-
-        if state.request_restart:
-            print("♻️ Restarting entire system now...")
-            script_path = os.path.abspath(__file__)
-            subprocess.Popen([sys.executable, script_path])
-            sys.exit(0)
-
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            print("❌ Error: Cannot access webcam.")
-            return
-
-        register_known_faces("known_faces")
-
-        frame_count = 0
-        faces = []
-        interaction_started = False
-        interaction_start_time = None
-        unrecognized_start_time = None
-
-        last_gesture = None
-        gesture_last_time = 0
-
-        wave_start_time = None
-        REQUIRED_WAVE_DURATION = 1.8
-
-        stable_gesture_buffer = []
-        STABLE_GESTURE_FRAMES = 3
-        MIN_TIME_BETWEEN_GESTURES = 2
-        gesture_cooldown_until = 0
-
-        cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-        cv2.resizeWindow(WINDOW_NAME, WINDOW_WIDTH, WINDOW_HEIGHT)
-
-        user_requested_exit = False
 
+from app.gesture_responder import start_animation_preload
+
+# Decode the reaction animations while the face and hand models below load
+start_animation_preload()
+
+from app.face_recognition import register_known_faces
+from app.recognition_worker import RecognitionWorker
+from app.camera_capture import CameraCapture
+from app.face_tracker import FaceTracker
+from app.pipeline import AppState, InteractionPipeline
+from app.interaction_flow import handle_goodbye_wave
+from app.frame_sink import create_sink
+from app.input_source import ScriptedInput, use_input
+from app.text_to_speech import speech, SilentEngine
+from app.stage_timer import timings
+from app.metrics import metrics, start_metrics_server
+from app.config import METRICS_PORT
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Face + gesture interaction.")
+    parser.add_argument("--source", default="0", help="Camera index or video file")
+    parser.add_argument("--headless", action="store_true",
+                        help="No window and no keyboard: frames go to --sink (null by default), "
+                             "registration answers come from --answers")
+    parser.add_argument("--sink", choices=["window", "file", "null", "shared"],
+                        help="Where composed frames go (default: window, or null when headless)")
+    parser.add_argument("--output", help="Video file for the file sink")
+    parser.add_argument("--answers", help="JSON list of scripted registration answers")
+    parser.add_argument("--silent", action="store_true", help="Do not play any speech")
+    parser.add_argument("--timings", action="store_true", help="Time each pipeline stage and print summaries")
+    parser.add_argument("--timings-out", help="Write the final stage timings to this JSON file")
+    parser.add_argument("--metrics", nargs="?", type=int, const=METRICS_PORT, metavar="PORT",
+                        help=f"Serve Prometheus metrics on localhost (default port {METRICS_PORT})")
+    return parser.parse_args()
+
+def main(args):
+    sink_kind = args.sink or ("null" if args.headless else "window")
+    if args.answers:
+        use_input(ScriptedInput.from_file(args.answers))
+    if args.silent:
+        speech.engine_factory = SilentEngine
+    if args.timings or args.timings_out:
+        timings.enabled = True
+
+    # Registration needs someone to answer its questions
+    state = AppState(registration_enabled=bool(args.answers) or not args.headless)
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    # The app's timers run on the wall clock, so a video file is played at its own
+    # frame rate (replay.py is the one for unpaced, simulated-clock runs)
+    camera = CameraCapture(source, realtime=True)
+    if not camera.isOpened():
+        print("❌ Error: Cannot access webcam.")
+        return
+    state.camera = camera
+
+    register_known_faces("known_faces")
+    face_tracker = FaceTracker()
+    recognizer = RecognitionWorker(recognize=face_tracker.update, scale_factor=0.3).start()
+    pipeline = InteractionPipeline(recognizer, state)
+    sink = create_sink(sink_kind, args.output, fps=camera.frame_rate() or 30.0)
+
+    if args.metrics:
+        metrics.add_source("pipeline", pipeline.stats)
+        metrics.add_source("camera", camera.stats)
+        metrics.add_source("recognition", recognizer.stats)
+        metrics.add_source("face_tracker", face_tracker.stats)
+        start_metrics_server(args.metrics, timings=timings)
+
+    camera.start()
+    start = time.perf_counter()
+
+    try:
         while True:
-            if state.request_restart:
+            # Newest mirrored frame from the capture thread
+            with timings.stage("capture.wait"):
+                captured = camera.read_frame()
+            if captured is None:
                 break
 
-            ret, frame = cap.read()
-            if not ret:
+            with timings.stage("frame"):
+                final_display = pipeline.process(captured.frame)
+            if pipeline.goodbye:
+                handle_goodbye_wave(captured.frame, captured.frame, camera, sink)
+                camera.frame_done(captured)
                 break
 
-            frame = cv2.flip(frame, 1)
-            frame_count += 1
-            current_time = time.time()
-            full_frame = frame.copy()
-
-            if frame_count % 3 == 0:
-                faces = detect_and_recognize(frame, scale_factor=0.3)
-
-            recognized = any(face["recognized"] for face in faces)
-            has_unrecognized_face = any(not face["recognized"] for face in faces)
-
-            unrecognized_start_time = check_for_registration_trigger(
-                has_unrecognized_face, recognized, state, current_time,
-                unrecognized_start_time, RECOGNITION_TIMEOUT
-            )
-
-            check_wave_and_start_registration(frame, state)
-
-            if recognized and not interaction_started:
-                interaction_started, interaction_start_time = start_interaction_if_wave(
-                    frame, faces, interaction_started, current_time
-                )
-
-            background_image = cv2.resize(RAW_BACKGROUND, (int(frame.shape[1] * 0.8), frame.shape[0]))
-            black_frame = background_image.copy()
-
-            if not interaction_started and not state.registration_in_progress and (
-                not last_gesture or current_time - gesture_last_time >= GESTURE_DISPLAY_DURATION):
-                black_frame = overlay_centered_animation(black_frame, IDLE_ANIMATION_NAME, state.idle_start_time)
-
-            black_frame = draw_interaction_status(
-                black_frame, current_time, interaction_start_time,
-                last_gesture, gesture_last_time, state
-            )
-
-            if interaction_started and current_time - interaction_start_time >= GESTURE_START_DELAY:
-                gesture = detect_custom_gesture(frame)
-
-                if gesture:
-                    if current_time >= gesture_cooldown_until:
-                        stable_gesture_buffer.append(gesture)
-                        if len(stable_gesture_buffer) > STABLE_GESTURE_FRAMES:
-                            stable_gesture_buffer.pop(0)
-
-                        if len(stable_gesture_buffer) == STABLE_GESTURE_FRAMES and all(g == gesture for g in stable_gesture_buffer):
-                            print(f"🖐️ Detected stable gesture: {gesture}")
-                            last_gesture = gesture
-                            gesture_last_time = current_time
-                            gesture_cooldown_until = current_time + MIN_TIME_BETWEEN_GESTURES
-                    else:
-                        stable_gesture_buffer.clear()
-                else:
-                    stable_gesture_buffer.clear()
-                    if detect_wave(frame):
-                        if wave_start_time is None:
-                            wave_start_time = current_time
-                        elif current_time - wave_start_time >= REQUIRED_WAVE_DURATION:
-                            handle_goodbye_wave(frame, full_frame, cap)
-                    else:
-                        wave_start_time = None
-
-                if last_gesture and current_time - gesture_last_time < GESTURE_DISPLAY_DURATION:
-                    black_frame = overlay_centered_animation(
-                        black_frame,
-                        last_gesture,
-                        gesture_last_time,
-                        duration=GESTURE_DISPLAY_DURATION
-                    )
-
-                    cv2.putText(
-                        black_frame,
-                        f"{last_gesture.replace('_', ' ')} detected!",
-                        (20, 50),
-                        FONT,
-                        FONT_SIZE_LARGE,
-                        COLOR_YELLOW,
-                        FONT_THICKNESS
-                    )
-
-            final_display = add_user_preview(black_frame.copy(), full_frame)
-            subtitle_text = get_current_subtitle()
-            final_display = add_subtitles(final_display, subtitle_text)
-
-            cv2.imshow(WINDOW_NAME, final_display)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                user_requested_exit = True
+            with timings.stage("display"):
+                keep_running = sink.show(final_display)
+            camera.frame_done(captured)
+            timings.maybe_report()
+            if not keep_running:
                 break
-
-        cap.release()
-        cv2.destroyAllWindows()
-
-        if user_requested_exit:
-            break
+    except KeyboardInterrupt:
+        pass
+
+    elapsed = time.perf_counter() - start
+    recognizer.stop()
+    camera.release()
+    sink.close()
+    if args.headless and elapsed > 0:
+        print(f"📊 {pipeline.frame_count} frame(s) in {elapsed:.1f}s ({pipeline.frame_count / elapsed:.1f} FPS)")
+    if timings.enabled:
+        timings.print_summary()
+        if args.timings_out:
+            timings.dump(args.timings_out)
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
@@ -5,8 +5,10 @@ import time
 import numpy as np
 from datetime import datetime
 from dumb.dumb_user_registration import handle_dumb_user_registration
-from app.config import RAW_BACKGROUND, WINDOW_NAME, WINDOW_WIDTH, WINDOW_HEIGHT, IDLE_ANIMATION_NAME, FONT, FONT_SIZE_SMALL, FONT_THICKNESS, COLOR_GRAY
+from app.config import WINDOW_NAME, WINDOW_WIDTH, WINDOW_HEIGHT, IDLE_ANIMATION_NAME, FONT, FONT_SIZE_SMALL, FONT_THICKNESS, COLOR_GRAY
 from app.gesture_responder import overlay_centered_animation
+from app.compositor import compositor, display_size
+from app.text_layer_cache import draw_text
 from app.screen_camera_and_subtitles import add_subtitles
 from app.subtitle_manager import update_subtitle
 
@@ -39,7 +41,6 @@ def main():
             break
 
         frame = cv2.flip(frame, 1)
-        background_frame = cv2.resize(RAW_BACKGROUND, (int(frame.shape[1] * 0.8), frame.shape[0]))
 
         time_since_last_trigger = time.time() - last_trigger_time
         motion_detected = detect_motion(frame, prev_frame)
@@ -52,11 +53,11 @@ def main():
         prev_frame = frame.copy()
 
         # ✅ Show looping idle animation with consistent start time
-        idle_frame = overlay_centered_animation(background_frame.copy(), IDLE_ANIMATION_NAME, idle_start_time)
+        idle_frame = overlay_centered_animation(compositor.begin(display_size(frame)), IDLE_ANIMATION_NAME, idle_start_time)
 
         # ✅ Add "Interaction Running..." text like smart version
-        cv2.putText(idle_frame, "Interaction Running...", (180, 20),
-                    FONT, FONT_SIZE_SMALL, COLOR_GRAY, FONT_THICKNESS)
+        draw_text(idle_frame, "Interaction Running...", (180, 20),
+                  FONT, FONT_SIZE_SMALL, COLOR_GRAY, FONT_THICKNESS)
 
         idle_frame = add_subtitles(idle_frame, update_subtitle("") or "")
 
@@ -0,0 +1,177 @@
+# replay.py
+#
+# Run the full main.py pipeline (face recognition, wave, gestures, rendering)
+# on a recorded video, with a simulated clock that follows the video's own
+# timestamps. Decisions are the same on every run, and the replay goes as fast
+# as the pipeline allows unless --speed is given.
+#
+#   python replay.py recording.mp4
+#   python replay.py recording.mp4 --speed 1 --sink window
+#   python replay.py recording.mp4 --sink file --output composed.mp4 --answers answers.json
+#   python replay.py recording.mp4 --quiet --out decisions.jsonl
+#
+# A replay never writes to the live stores: it runs on a scratch copy of
+# data/face_gesture.db (or the file given with --db), and photos of users
+# registered during the replay go to a scratch folder.
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+LIVE_DB_FILE = os.path.join("data", "face_gesture.db")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a video through the interaction pipeline.")
+    parser.add_argument("video", help="Path of the recorded video")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Playback speed relative to real time (0 = as fast as possible)")
+    parser.add_argument("--no-mirror", action="store_true",
+                        help="Do not mirror frames (for recordings that are already mirrored)")
+    parser.add_argument("--sink", choices=["window", "file", "null", "shared"], default="null",
+                        help="Where composed frames go")
+    parser.add_argument("--output", help="Video file for the file sink")
+    parser.add_argument("--answers", help="JSON list of scripted registration answers "
+                                          "(registration is skipped without it)")
+    parser.add_argument("--quiet", action="store_true", help="Only print frames with a decision")
+    parser.add_argument("--out", help="Write per-frame decisions to this JSON-lines file")
+    parser.add_argument("--known-faces", default="known_faces")
+    parser.add_argument("--db", help="Database file to use and keep "
+                                     "(default: a scratch copy of the live database, deleted afterwards)")
+    parser.add_argument("--timings", action="store_true", help="Time each pipeline stage")
+    parser.add_argument("--timings-out", help="Write the stage timings to this JSON file")
+    return parser.parse_args()
+
+def copy_database(source, destination):
+    """
+    Copy a SQLite database, including changes still in its WAL file.
+    """
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(destination)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+# Storage has to be redirected before any app module opens the database
+args = parse_args() if __name__ == "__main__" else None
+scratch_folder = tempfile.mkdtemp(prefix="replay_")
+db_file = (args and args.db) or os.path.join(scratch_folder, "face_gesture.db")
+if not (args and args.db) and os.path.exists(LIVE_DB_FILE):
+    copy_database(LIVE_DB_FILE, db_file)
+os.environ["FACE_GESTURE_DB"] = db_file
+
+from app.clock import SimulatedClock, use_clock
+
+clock = SimulatedClock(start=time.time())
+use_clock(clock)
+
+from app import new_user_registration
+from app.database import db
+from app.text_to_speech import speech, SilentEngine
+from app.face_recognition import register_known_faces
+from app.recognition_worker import InlineRecognizer
+from app.camera_capture import CameraCapture
+from app.face_tracker import FaceTracker
+from app.pipeline import AppState, InteractionPipeline
+from app.frame_sink import create_sink
+from app.input_source import ScriptedInput, use_input
+from app.stage_timer import timings
+
+def replay(args):
+    # No audio during a replay, but utterances still go through the speech queue
+    speech.engine_factory = SilentEngine
+    new_user_registration.KNOWN_FACES_FOLDER = os.path.join(scratch_folder, "known_faces")
+    if args.timings or args.timings_out:
+        timings.enabled = True
+
+    camera = CameraCapture(args.video, mirror=not args.no_mirror, realtime=False)
+    if not camera.isOpened():
+        print(f"❌ Error: Cannot open video {args.video}.")
+        return
+    fps = camera.frame_rate() or 30.0
+
+    register_known_faces(args.known_faces)
+    face_tracker = FaceTracker()
+    recognizer = InlineRecognizer(recognize=face_tracker.update, scale_factor=0.3)
+    if args.answers:
+        use_input(ScriptedInput.from_file(args.answers))
+    state = AppState(registration_enabled=bool(args.answers))
+    state.camera = camera
+    pipeline = InteractionPipeline(recognizer, state)
+    sink = create_sink(args.sink, args.output, fps=fps)
+
+    out = open(args.out, "w") if args.out else None
+    video_start = clock.now()
+    frames = 0
+    decisions = 0
+    camera.start()
+    wall_start = time.perf_counter()
+
+    while True:
+        captured = camera.read_frame()
+        if captured is None:
+            break
+
+        video_time = (captured.seq - 1) / fps
+        clock.set(video_start + video_time)
+
+        with timings.stage("frame"):
+            final_display = pipeline.process(captured.frame)
+        camera.frame_done(captured)
+        frames += 1
+
+        record = {
+            "frame": captured.seq,
+            "time": round(video_time, 3),
+            "faces": [face["name"] for face in pipeline.faces],
+            "events": pipeline.events,
+        }
+        if pipeline.events:
+            decisions += 1
+        if pipeline.events or not args.quiet:
+            print(f"{record['frame']:6d}  {video_time:8.2f}s  faces={record['faces']}  events={record['events']}")
+        if out:
+            out.write(json.dumps(record) + "\n")
+
+        with timings.stage("display"):
+            keep_running = sink.show(final_display)
+        timings.maybe_report()
+        if not keep_running:
+            break
+
+        if args.speed > 0:
+            delay = wall_start + video_time / args.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        if pipeline.goodbye:
+            print("👋 Goodbye wave: the live app would close here.")
+            break
+
+    elapsed = time.perf_counter() - wall_start
+    camera.release()
+    if out:
+        out.close()
+    sink.close()
+
+    video_seconds = frames / fps
+    print(f"\n📊 {frames} frame(s), {decisions} with a decision, in {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"📊 {frames / elapsed:.1f} FPS ({video_seconds / elapsed:.2f}x real time)")
+    print(f"📊 Face tracker: {face_tracker.stats()}")
+    if timings.enabled:
+        timings.print_summary()
+        if args.timings_out:
+            timings.dump(args.timings_out)
+
+if __name__ == "__main__":
+    try:
+        replay(args)
+    finally:
+        db.close()
+        shutil.rmtree(scratch_folder, ignore_errors=True)